@@ -5,7 +5,42 @@ Filename utilities for wiki archive scripts.
 Converts between wiki page titles and safe filenames.
 """
 
+import re
+from functools import lru_cache
 
+# Titles repeat heavily across link rewriting and change detection
+_CACHE_SIZE = 200_000
+
+# Characters that are unsafe in filenames, mapped to their escape tokens.
+# Built once so title_to_filename can do a single C-level translate pass.
+_TITLE_TRANS = str.maketrans({
+    "/": "_SLASH_",
+    "\\": "_BACKSLASH_",
+    ":": "_COLON_",
+    "*": "_STAR_",
+    "?": "_QUESTION_",
+    '"': "_QUOTE_",
+    "<": "_LT_",
+    ">": "_GT_",
+    "|": "_PIPE_",
+})
+
+# Reverse mapping for filename_to_title, matched in one regex pass
+_FILENAME_TOKENS = {
+    "_SLASH_": "/",
+    "_BACKSLASH_": "\\",
+    "_COLON_": ":",
+    "_STAR_": "*",
+    "_QUESTION_": "?",
+    "_QUOTE_": '"',
+    "_LT_": "<",
+    "_GT_": ">",
+    "_PIPE_": "|",
+}
+_FILENAME_TOKEN_RE = re.compile("|".join(map(re.escape, _FILENAME_TOKENS)))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
 def title_to_filename(title: str) -> str:
     """
     Convert a wiki page title to a safe filename.
@@ -16,18 +51,26 @@ def title_to_filename(title: str) -> str:
     Returns:
         Safe filename with .html extension (e.g., "Category_COLON_Weapons.html")
     """
-    safe = title.replace("/", "_SLASH_")
-    safe = safe.replace("\\", "_BACKSLASH_")
-    safe = safe.replace(":", "_COLON_")
-    safe = safe.replace("*", "_STAR_")
-    safe = safe.replace("?", "_QUESTION_")
-    safe = safe.replace('"', "_QUOTE_")
-    safe = safe.replace("<", "_LT_")
-    safe = safe.replace(">", "_GT_")
-    safe = safe.replace("|", "_PIPE_")
-    return safe + ".html"
+    return f"{title.translate(_TITLE_TRANS)}.html"
+
+
+def title_to_filename_bytes(title: str) -> bytes:
+    """
+    Convert a wiki page title to a safe filename as UTF-8 bytes.
+
+    Same mapping as title_to_filename, for callers that pass filenames
+    straight to byte-oriented file APIs.
+
+    Args:
+        title: Wiki page title (e.g., "Category:Weapons")
+
+    Returns:
+        Safe filename bytes with .html extension (e.g., b"Category_COLON_Weapons.html")
+    """
+    return title.translate(_TITLE_TRANS).encode("utf-8") + b".html"
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
 def filename_to_title(filename: str) -> str:
     """
     Convert a filename back to a wiki page title.
@@ -38,14 +81,5 @@ def filename_to_title(filename: str) -> str:
     Returns:
         Wiki page title (e.g., "Category:Weapons")
     """
-    title = filename.replace(".html", "")
-    title = title.replace("_SLASH_", "/")
-    title = title.replace("_BACKSLASH_", "\\")
-    title = title.replace("_COLON_", ":")
-    title = title.replace("_STAR_", "*")
-    title = title.replace("_QUESTION_", "?")
-    title = title.replace("_QUOTE_", '"')
-    title = title.replace("_LT_", "<")
-    title = title.replace("_GT_", ">")
-    title = title.replace("_PIPE_", "|")
-    return title
+    title = filename[:-5] if filename.endswith(".html") else filename
+    return _FILENAME_TOKEN_RE.sub(lambda m: _FILENAME_TOKENS[m.group(0)], title)
@@ -13,16 +13,114 @@ Usage:
         log_dir="/var/log",  # Optional, defaults to ./logs
     )
     logger.info("Starting import...")
+
+Pass use_queue=True to hand records to a background thread so the caller
+never blocks on disk writes or rotation, and compress_backups=True to gzip
+rotated files (*.log.1.gz, ...) instead of keeping them as plain *.log.1.
 """
 
+import atexit
+import gzip
 import logging
 import os
+import queue
+import shutil
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
+# Active queue listeners, keyed by logger name
+_listeners: dict[str, QueueListener] = {}
+
+# Single worker shared by all handlers, so backup renames never overlap
+_rotation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-rotation")
+
+
+def _gzip_namer(name: str) -> str:
+    """Name rotated backups with a .gz suffix."""
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress a rotated log file into dest and remove the original."""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb", compresslevel=3) as f_out:
+        shutil.copyfileobj(f_in, f_out, length=64 * 1024)
+    os.remove(source)
+
+
+class AsyncRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that shifts old backups on a background thread.
+
+    On rollover the current file is renamed to "<name>.1.pending" and a
+    fresh file is opened inline; the ".1 -> .2 -> ..." cascade runs on a
+    worker so the logging thread is not held up by a chain of renames.
+
+    With compress=True, backups are gzipped on that worker as well and
+    named "<name>.1.gz", "<name>.2.gz", ...
+    """
+
+    def __init__(self, *args, compress: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rotation_lock = threading.Lock()
+        self._rotation: Optional[Future] = None
+        if compress:
+            self.namer = _gzip_namer
+            self.rotator = _gzip_rotator
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if self.backupCount > 0:
+            with self._rotation_lock:
+                # Serialize with any cascade still running from the last rollover
+                if self._rotation is not None:
+                    self._rotation.result()
+                pending = self.baseFilename + ".1.pending"
+                if os.path.exists(self.baseFilename):
+                    os.replace(self.baseFilename, pending)
+                self._rotation = _rotation_executor.submit(self._shift_backups, pending)
+
+        if not self.delay:
+            self.stream = self._open()
+
+    def _shift_backups(self, pending: str):
+        """Shift existing backups up by one and move the pending file to .1."""
+        for i in range(self.backupCount - 1, 0, -1):
+            sfn = self.rotation_filename(f"{self.baseFilename}.{i}")
+            dfn = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
+            if os.path.exists(sfn):
+                os.replace(sfn, dfn)
+        if os.path.exists(pending):
+            self.rotate(pending, self.rotation_filename(self.baseFilename + ".1"))
+
+    def wait_for_rotation(self):
+        """Block until any in-flight backup rotation has finished."""
+        with self._rotation_lock:
+            if self._rotation is not None:
+                self._rotation.result()
+                self._rotation = None
+
+    def close(self):
+        self.wait_for_rotation()
+        super().close()
+
+
+def _stop_listeners():
+    """Flush and stop all queue listeners (registered with atexit)."""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
+
+atexit.register(_stop_listeners)
+
 
 def setup_logging(
     name: str,
@@ -32,6 +130,8 @@ def setup_logging(
     max_bytes: int = 10 * 1024 * 1024,  # 10 MB
     backup_count: int = 5,
     console: bool = True,
+    use_queue: bool = False,
+    compress_backups: bool = False,
 ) -> logging.Logger:
     """
     Set up logging to console and file.
@@ -44,6 +144,8 @@ def setup_logging(
         max_bytes: Max log file size before rotation
         backup_count: Number of rotated log files to keep
         console: Whether to also log to console
+        use_queue: Write records from a background thread via a QueueListener
+        compress_backups: Gzip rotated log files (named *.log.1.gz, ...)
 
     Returns:
         Configured logger instance
@@ -71,6 +173,9 @@ def setup_logging(
 
     # Clear any existing handlers (for re-initialization)
     logger.handlers.clear()
+    previous = _listeners.pop(name, None)
+    if previous is not None:
+        previous.stop()
 
     # Create formatter
     formatter = logging.Formatter(
@@ -79,22 +184,34 @@ def setup_logging(
     )
 
     # File handler with rotation
-    file_handler = RotatingFileHandler(
+    file_handler = AsyncRotatingFileHandler(
         log_file,
         maxBytes=max_bytes,
         backupCount=backup_count,
         encoding="utf-8",
+        compress=compress_backups,
     )
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     # Console handler
     if console:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    if use_queue:
+        # Offload formatting and I/O to a listener thread
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners[name] = listener
+        logger.addHandler(QueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
     logger.info(f"Logging initialized: {log_file}")
     return logger
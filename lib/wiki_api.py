@@ -20,10 +20,103 @@ Usage:
 """
 
 import logging
+import queue
+import random
+import sys
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson  # Optional: faster JSON decoding straight from bytes
+except ImportError:
+    orjson = None
+
+# Upper bound on concurrent workers; MediaWiki asks clients to stay small
+MAX_WORKERS = 4
+
+# Read size when streaming export responses
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Titles per prop=revisions query (MediaWiki's limit for non-bot clients)
+TITLES_PER_QUERY = 50
+
+# Upper bound on the random jitter added to each retry delay, in seconds
+RETRY_JITTER = 0.5
+
+# Factor applied to the request delay each time the server answers 429
+RATE_LIMIT_SLOWDOWN = 1.2
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed request is worth retrying.
+
+    Rate limiting (429), server errors (5xx), connection failures, timeouts
+    and truncated or undecodable bodies are treated as transient. Other
+    client errors (400/401/403/404/410, ...) and malformed URLs fail fast.
+
+    Args:
+        error: Exception raised by the request or while decoding its body
+
+    Returns:
+        True if the request should be retried
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        if response is None:
+            return True
+        return response.status_code == 429 or response.status_code >= 500
+    if isinstance(error, (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.InvalidJSONError,
+    )):
+        return True
+    if isinstance(error, requests.RequestException):
+        return False
+    return isinstance(error, ValueError)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Return True if the error is an HTTP 429 Too Many Requests response."""
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 429
+
+
+def backoff_delay(
+    attempt: int,
+    retry_delay: float,
+    max_backoff: float,
+    response: Optional[requests.Response] = None,
+) -> float:
+    """
+    Seconds to wait before retrying a failed request.
+
+    A numeric Retry-After header on the response is honored as-is. Otherwise
+    the delay grows linearly with the attempt number, is capped at
+    max_backoff, and gets up to RETRY_JITTER seconds of random jitter so
+    concurrent workers do not retry in lockstep.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+        retry_delay: Base delay in seconds
+        max_backoff: Cap on the computed delay in seconds
+        response: Failed response, if the server sent one
+
+    Returns:
+        Delay in seconds
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdecimal():
+            return float(retry_after)
+    return min(retry_delay * (attempt + 1), max_backoff) + random.uniform(0, RETRY_JITTER)
 
 
 class WikiAPI:
@@ -37,8 +130,11 @@ class WikiAPI:
         timeout: float = 30.0,
         max_retries: int = 3,
         retry_delay: float = 5.0,
+        max_backoff: float = 60.0,
         user_agent: Optional[str] = None,
         logger: Optional[logging.Logger] = None,
+        workers: int = 1,
+        pool_size: int = 16,
     ):
         """
         Initialize the Wiki API client.
@@ -49,9 +145,16 @@ class WikiAPI:
             delay: Seconds to wait between requests (be polite)
             timeout: Request timeout in seconds
             max_retries: Number of retry attempts for failed requests
-            retry_delay: Seconds to wait between retries
+            retry_delay: Base seconds to wait between retries; grows with
+                each attempt (see backoff_delay)
+            max_backoff: Cap on the delay between retries in seconds
             user_agent: Custom user agent string
             logger: Logger instance (creates one if not provided)
+            workers: Namespaces to enumerate concurrently (capped at MAX_WORKERS);
+                each worker waits `delay` between its own requests
+            pool_size: Maximum keep-alive connections to the wiki host; threads
+                sharing this client wait for a free connection rather than
+                opening extra ones
         """
         self.api_url = api_url
         self.wiki_name = wiki_name
@@ -59,22 +162,77 @@ class WikiAPI:
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.workers = max(1, min(workers, MAX_WORKERS))
+
+        # Earliest monotonic time any thread may send the next request
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
 
         # Set up logger
         self.logger = logger or logging.getLogger(f"wiki_api.{wiki_name}")
 
-        # Set up session
+        # Set up session with a persistent connection pool so every request
+        # reuses the same keep-alive TCP/TLS connection to the wiki host.
+        # The pool is capped (pool_block) so callers sharing this session from
+        # several threads never open more than pool_size connections.
+        # Retries are handled in request(), not by urllib3.
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(pool_size, self.workers),
+            pool_block=True,
+            max_retries=0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "User-Agent": user_agent or f"{wiki_name}-Archiver/1.0 (community preservation)",
             "Accept": "application/json",
             "Accept-Language": "en-US,en;q=0.5",
+            "Connection": "keep-alive",
         })
 
+    def throttle(self):
+        """
+        Wait until the calling thread may send its next request.
+
+        Request slots are handed out `delay` seconds apart across all threads
+        sharing this client, so the wiki sees at most one request per delay
+        however many workers are running. Spacing is measured start to start:
+        time spent waiting on the server counts toward the delay instead of
+        being added on top of it, and workers still overlap their waits.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + self.delay
+
+        if start > now:
+            time.sleep(start - now)
+
+    def slow_down(self):
+        """
+        Stretch the delay between requests after the server rate-limits us.
+
+        Each call raises `delay` by RATE_LIMIT_SLOWDOWN, capped at
+        max_backoff. The new pace applies to every thread sharing this client
+        for the rest of the run.
+        """
+        with self._lock:
+            delay = min(self.delay * RATE_LIMIT_SLOWDOWN, self.max_backoff)
+            if delay <= self.delay:
+                return
+            self.delay = delay
+        self.logger.warning(f"Rate limited; request delay raised to {delay:.2f}s")
+
     def request(self, params: dict, description: str = "API request") -> Optional[dict]:
         """
         Make an API request with retries and rate limiting.
 
+        Transient failures are retried with jittered, capped backoff; errors
+        that a retry cannot fix (see is_retryable) fail immediately.
+
         Args:
             params: Query parameters for the API call
             description: Human-readable description for logging
@@ -82,25 +240,35 @@ class WikiAPI:
         Returns:
             JSON response as dict, or None if all retries failed
         """
-        params["format"] = "json"
+        # Only set once: pagination loops pass the same dict on every call
+        params.setdefault("format", "json")
 
         for attempt in range(self.max_retries):
             try:
-                time.sleep(self.delay)  # Rate limiting
+                self.throttle()
                 response = self.session.get(
                     self.api_url,
                     params=params,
                     timeout=self.timeout,
                 )
                 response.raise_for_status()
+                if orjson is not None:
+                    return orjson.loads(response.content)
                 return response.json()
 
-            except requests.RequestException as e:
+            except (requests.RequestException, ValueError) as e:
+                if is_rate_limited(e):
+                    self.slow_down()
+                if not is_retryable(e):
+                    self.logger.error(f"FAILED (not retryable): {description}: {e}")
+                    return None
                 self.logger.warning(
                     f"Attempt {attempt + 1}/{self.max_retries} failed for {description}: {e}"
                 )
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    time.sleep(backoff_delay(
+                        attempt, self.retry_delay, self.max_backoff, getattr(e, "response", None)
+                    ))
 
         self.logger.error(f"FAILED after {self.max_retries} attempts: {description}")
         return None
@@ -121,17 +289,14 @@ class WikiAPI:
             self.logger.warning("Failed to fetch namespaces; defaulting to main namespace only")
             return [0]
 
-        namespaces = []
+        namespaces = set()
         for ns_id_str in data.get("query", {}).get("namespaces", {}):
-            try:
-                ns_id = int(ns_id_str)
-                if ns_id >= 0:
-                    namespaces.append(ns_id)
-            except ValueError:
-                continue
+            # Non-negative IDs only; negative ones (Special, Media) are virtual
+            if ns_id_str.isdecimal():
+                namespaces.add(int(ns_id_str))
 
         self.logger.debug(f"Found {len(namespaces)} namespaces")
-        return sorted(set(namespaces))
+        return sorted(namespaces)
 
     def get_all_pages(self, namespaces: Optional[list[int]] = None) -> list[dict]:
         """
@@ -147,32 +312,119 @@ class WikiAPI:
             namespaces = self.get_namespaces()
 
         self.logger.info(f"Fetching pages from {len(namespaces)} namespaces...")
+
+        workers = min(self.workers, len(namespaces))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._get_namespace_batches, namespaces))
+        else:
+            results = [self._get_namespace_batches(ns) for ns in namespaces]
+
         pages = []
+        for ns_batches in results:
+            for batch in ns_batches:
+                pages.extend(batch)
 
-        for ns in namespaces:
-            params = {
-                "action": "query",
-                "list": "allpages",
-                "aplimit": "500",
-                "apnamespace": str(ns),
-            }
+        self.logger.info(f"Total pages found: {len(pages)}")
+        return pages
+
+    def iter_pages(self, namespaces: Optional[list[int]] = None) -> Iterator[dict]:
+        """
+        Yield pages across specified namespaces as each API batch arrives.
 
-            while True:
-                data = self.request(params.copy(), f"fetching page list (ns={ns})")
-                if not data:
-                    break
+        Unlike get_all_pages, callers can start work on the first batch
+        while later ones are still being fetched. With more than one worker,
+        namespaces are listed concurrently (like get_all_pages) and pages
+        arrive in whatever order their batches do.
 
-                batch = data.get("query", {}).get("allpages", [])
-                pages.extend(batch)
-                self.logger.debug(f"Retrieved {len(pages)} pages so far...")
+        Args:
+            namespaces: List of namespace IDs to query (None = all namespaces)
 
-                if "continue" in data:
-                    params["apcontinue"] = data["continue"]["apcontinue"]
+        Yields:
+            Page dicts with 'title' and 'pageid' keys
+        """
+        if namespaces is None:
+            namespaces = self.get_namespaces()
+
+        workers = min(self.workers, len(namespaces))
+        if workers > 1:
+            yield from self._iter_pages_concurrent(namespaces, workers)
+            return
+
+        for ns in namespaces:
+            for batch in self._iter_namespace_batches(ns):
+                yield from batch
+
+    def _iter_pages_concurrent(self, namespaces: list[int], workers: int) -> Iterator[dict]:
+        """Yield pages from several namespaces as listing threads fetch them."""
+        batches = queue.Queue()
+        stop = threading.Event()
+
+        def list_namespace(ns):
+            try:
+                for batch in self._iter_namespace_batches(ns):
+                    if stop.is_set():
+                        break
+                    batches.put(batch)
+            except Exception as e:
+                batches.put(e)
+            finally:
+                # One None per namespace marks it finished
+                batches.put(None)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for ns in namespaces:
+                executor.submit(list_namespace, ns)
+
+            remaining = len(namespaces)
+            while remaining:
+                item = batches.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
                 else:
-                    break
+                    yield from item
+        finally:
+            # Stop listing if the caller gave up early or a namespace failed
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_namespace_batches(self, ns: int) -> list[list[dict]]:
+        """Fetch all pages in a single namespace as a list of API batches."""
+        return list(self._iter_namespace_batches(ns))
+
+    def _iter_namespace_batches(self, ns: int) -> Iterator[list[dict]]:
+        """Yield allpages batches for one namespace, following continuations."""
+        count = 0
+        params = {
+            "action": "query",
+            "list": "allpages",
+            "aplimit": "500",
+            "apnamespace": str(ns),
+        }
 
-        self.logger.info(f"Total pages found: {len(pages)}")
-        return pages
+        while True:
+            data = self.request(params, f"fetching page list (ns={ns})")
+            if not data:
+                break
+
+            batch = data.get("query", {}).get("allpages", [])
+            for page in batch:
+                # Titles are reused as dict keys downstream; intern them
+                page["title"] = sys.intern(page["title"])
+            count += len(batch)
+            self.logger.debug(f"Retrieved {count} pages so far (ns={ns})...")
+
+            next_page = data.get("continue", {}).get("apcontinue")
+            # Only the batch outlives this iteration; release the response
+            del data
+            yield batch
+
+            if next_page is None:
+                break
+            params["apcontinue"] = next_page
 
     def get_page_titles(self, namespaces: Optional[list[int]] = None) -> list[str]:
         """
@@ -187,7 +439,20 @@ class WikiAPI:
         pages = self.get_all_pages(namespaces)
         return [p["title"] for p in pages]
 
-    def get_recent_changes(self, since: str, types: str = "edit|new") -> set[str]:
+    def get_page_titles_iter(self, namespaces: Optional[list[int]] = None) -> Iterator[str]:
+        """
+        Yield page titles across specified namespaces as each API batch arrives.
+
+        Args:
+            namespaces: List of namespace IDs to query (None = all namespaces)
+
+        Yields:
+            Page title strings
+        """
+        for page in self.iter_pages(namespaces):
+            yield page["title"]
+
+    def get_recent_changes(self, since: str, types: str = "edit|new") -> list[str]:
         """
         Get pages changed since a given timestamp.
 
@@ -196,12 +461,13 @@ class WikiAPI:
             types: Change types to include (default: "edit|new")
 
         Returns:
-            Set of page titles that have changed
+            Changed page titles, deduplicated, newest change first
         """
         from datetime import datetime, timezone
 
         self.logger.info(f"Fetching changes since {since}...")
-        changed_pages = set()
+        # dict keeps first-seen (newest) order while deduplicating
+        changed_pages: dict[str, None] = {}
 
         params = {
             "action": "query",
@@ -214,13 +480,13 @@ class WikiAPI:
         }
 
         while True:
-            data = self.request(params.copy(), "fetching recent changes")
+            data = self.request(params, "fetching recent changes")
             if not data:
                 break
 
             changes = data.get("query", {}).get("recentchanges", [])
             for change in changes:
-                changed_pages.add(change["title"])
+                changed_pages.setdefault(sys.intern(change["title"]))
 
             if "continue" in data:
                 params["rccontinue"] = data["continue"]["rccontinue"]
@@ -228,7 +494,45 @@ class WikiAPI:
                 break
 
         self.logger.info(f"Pages changed since last crawl: {len(changed_pages)}")
-        return changed_pages
+        return list(changed_pages)
+
+    def get_page_revisions(self, titles: list[str]) -> dict[str, int]:
+        """
+        Fetch the latest revision ID of each page, batching titles per request.
+
+        Args:
+            titles: List of page titles to look up
+
+        Returns:
+            Dict mapping title to latest revision ID. Missing pages and
+            titles in failed batches are left out.
+        """
+        revisions = {}
+
+        for start in range(0, len(titles), TITLES_PER_QUERY):
+            batch = titles[start:start + TITLES_PER_QUERY]
+            params = {
+                "action": "query",
+                "titles": "|".join(batch),
+                "prop": "revisions",
+                "rvprop": "ids",
+            }
+
+            data = self.request(params, "fetching page revisions")
+            if not data:
+                continue
+
+            query = data.get("query", {})
+            # Map normalized titles (e.g. underscores -> spaces) back to the input
+            original = {n["to"]: n["from"] for n in query.get("normalized", [])}
+            for page in query.get("pages", {}).values():
+                page_revisions = page.get("revisions")
+                if page_revisions:
+                    title = original.get(page["title"], page["title"])
+                    revisions[title] = page_revisions[0]["revid"]
+
+        self.logger.debug(f"Fetched revisions for {len(revisions)}/{len(titles)} pages")
+        return revisions
 
     def get_all_images(self) -> list[dict]:
         """
@@ -247,7 +551,7 @@ class WikiAPI:
         }
 
         while True:
-            data = self.request(params.copy(), "fetching image list")
+            data = self.request(params, "fetching image list")
             if not data:
                 break
 
@@ -263,15 +567,22 @@ class WikiAPI:
         self.logger.info(f"Total images found: {len(images)}")
         return images
 
-    def export_pages(self, titles: list[str]) -> Optional[str]:
+    def export_pages(self, titles: list[str], sink=None):
         """
         Export pages as XML using the MediaWiki export API.
 
+        The response is streamed in chunks rather than buffered whole. With a
+        sink, chunks go straight to it; without one they are joined and
+        decoded once at the end, with invalid UTF-8 replaced.
+
         Args:
             titles: List of page titles to export
+            sink: Optional binary file-like object (anything with write()) or
+                an XMLPullParser (anything with feed()) to receive the XML
 
         Returns:
-            XML content as string, or None on failure
+            XML content as string (or the sink, once written), or None on
+            failure. A sink may hold partial data after a failure.
         """
         self.logger.debug(f"Exporting batch of {len(titles)} pages...")
 
@@ -282,11 +593,20 @@ class WikiAPI:
             "exportnowrap": "1",
         }
 
-        time.sleep(self.delay)
+        self.throttle()
         try:
-            response = self.session.get(self.api_url, params=params, timeout=60)
-            response.raise_for_status()
-            return response.text
+            with self.session.get(self.api_url, params=params, timeout=60, stream=True) as response:
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size=EXPORT_CHUNK_SIZE)
+                if sink is None:
+                    return b"".join(chunks).decode("utf-8", errors="replace")
+
+                write = sink.write if hasattr(sink, "write") else sink.feed
+                for chunk in chunks:
+                    write(chunk)
+                return sink
         except requests.RequestException as e:
+            if is_rate_limited(e):
+                self.slow_down()
             self.logger.error(f"Export failed: {e}")
             return None
@@ -8,6 +8,7 @@ Or via npx: npx pagefind
 """
 
 import json
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -22,21 +23,24 @@ with open(CONFIG_PATH, "r", encoding="utf-8") as f:
 
 DOCS_DIR = PROJECT_ROOT / CONFIG["output"]["docs_dir"]
 
+# Resolve npx once so Pagefind can be run without a shell
+NPX = shutil.which("npx") or shutil.which("npx.cmd")
+
 
 def check_pagefind_installed():
     """Check if Pagefind is available."""
-    try:
-        result = subprocess.run(
-            ["npx", "pagefind", "--version"],
-            capture_output=True,
-            text=True,
-            shell=True
-        )
-        if result.returncode == 0:
-            print(f"Pagefind version: {result.stdout.strip()}")
-            return True
-    except FileNotFoundError:
-        pass
+    if NPX:
+        try:
+            result = subprocess.run(
+                [NPX, "pagefind", "--version"],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                print(f"Pagefind version: {result.stdout.strip()}")
+                return True
+        except FileNotFoundError:
+            pass
 
     print("ERROR: Pagefind is not installed.")
     print("Install it with: npm install -g pagefind")
@@ -51,7 +55,7 @@ def build_search_index():
 
     # Pagefind command
     cmd = [
-        "npx", "pagefind",
+        NPX, "pagefind",
         "--site", str(DOCS_DIR),
         "--output-subdir", "search",
         # Only index the wiki pages, not the homepage or assets
@@ -61,24 +65,25 @@ def build_search_index():
     print(f"Running: {' '.join(cmd)}")
 
     try:
-        result = subprocess.run(
+        # Stream output line by line instead of buffering the whole build log
+        with subprocess.Popen(
             cmd,
             cwd=PROJECT_ROOT,
-            shell=True,
-            capture_output=True,
-            text=True
-        )
-
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        ) as proc:
+            for line in proc.stdout:
+                sys.stdout.write(line)
+            returncode = proc.wait()
 
-        if result.returncode == 0:
+        if returncode == 0:
             print("\nSearch index built successfully!")
             print(f"Index location: {DOCS_DIR / 'search'}")
             return True
         else:
-            print(f"\nERROR: Pagefind failed with return code {result.returncode}")
+            print(f"\nERROR: Pagefind failed with return code {returncode}")
             return False
 
     except Exception as e:
@@ -100,7 +105,8 @@ def main():
         sys.exit(1)
 
     wiki_dir = DOCS_DIR / "wiki"
-    if not wiki_dir.exists() or not any(wiki_dir.glob("*.html")):
+    # iterdir() is lazy, so this stops at the first HTML file found
+    if not wiki_dir.exists() or not any(p.suffix == ".html" for p in wiki_dir.iterdir()):
         print(f"ERROR: No HTML files found in {wiki_dir}")
         print("Run crawl.py first to download wiki pages.")
         sys.exit(1)
@@ -8,24 +8,37 @@ Respects the wiki by using appropriate delays and identifying itself.
 Usage:
     python scripts/crawl.py --incremental  # Crawl only changed pages (default)
     python scripts/crawl.py --full         # Full crawl of entire wiki
+    python scripts/crawl.py --full --resume  # Continue an interrupted full crawl
 """
 
+import copy
+import hashlib
 import json
+import re
+import string
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 from pathlib import Path
 from urllib.parse import urljoin, quote
 
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    import orjson  # Optional: much faster manifest serialization
+except ImportError:
+    orjson = None
+
 # Add project root to path for shared lib
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from lib.wiki_api import WikiAPI
+from lib.wiki_api import WikiAPI, backoff_delay, is_rate_limited, is_retryable
 from lib.logging_config import setup_logging
 from lib.filename_utils import title_to_filename, filename_to_title
 
@@ -39,6 +52,12 @@ DOCS_DIR = PROJECT_ROOT / CONFIG["output"]["docs_dir"]
 WIKI_DIR = PROJECT_ROOT / CONFIG["output"]["wiki_dir"]
 DATA_DIR = PROJECT_ROOT / CONFIG["output"]["data_dir"]
 MANIFEST_PATH = DATA_DIR / "manifest.json"
+# Per-page manifest updates since the last save, one JSON object per line
+MANIFEST_LOG_PATH = DATA_DIR / "manifest.log.jsonl"
+# An unfinished full crawl checkpoints here, leaving manifest.json intact
+# until it completes
+MANIFEST_PARTIAL_PATH = DATA_DIR / "manifest.partial.json"
+MANIFEST_PARTIAL_LOG_PATH = DATA_DIR / "manifest.partial.log.jsonl"
 
 # Wiki settings
 WIKI_NAME = CONFIG["wiki"]["name"]
@@ -50,15 +69,29 @@ DELAY = CONFIG["crawl"]["delay_seconds"]
 TIMEOUT = CONFIG["crawl"]["timeout_seconds"]
 MAX_RETRIES = CONFIG["crawl"]["max_retries"]
 RETRY_DELAY = CONFIG["crawl"]["retry_delay_seconds"]
+MAX_BACKOFF = CONFIG["crawl"].get("max_backoff_seconds", 60)
+CONCURRENCY = CONFIG["crawl"].get("concurrency", 1)
+# Fetch rendered content via action=parse instead of the skinned page URL
+USE_PARSE_API = CONFIG["crawl"].get("use_parse_api", False)
+
+# Page files are written in the background so disk I/O overlaps fetching
+WRITE_WORKERS = 4
+
+# Pages between manifest checkpoints during a crawl
+CHECKPOINT_INTERVAL = 100
 
 # Set up logging (logs to ./logs by default)
 logger = setup_logging(
     name="crawl",
     wiki_id=CONFIG["wiki"]["name"].lower().replace(" ", "-"),
     log_dir=str(PROJECT_ROOT / "logs"),
+    use_queue=True,
+    compress_backups=True,
 )
 
-# Set up API client
+# Set up API client. Page fetches reuse api.session too, so size its
+# keep-alive pool to the crawl concurrency: every worker keeps one warm
+# connection to the wiki for both API calls and page HTML.
 api = WikiAPI(
     api_url=API_URL,
     wiki_name=WIKI_NAME,
@@ -66,105 +99,233 @@ api = WikiAPI(
     timeout=TIMEOUT,
     max_retries=MAX_RETRIES,
     retry_delay=RETRY_DELAY,
+    max_backoff=MAX_BACKOFF,
     user_agent=USER_AGENT,
     logger=logger,
+    workers=CONCURRENCY,
+    pool_size=CONCURRENCY,
 )
 
 
-def load_manifest() -> dict:
-    """Load the existing manifest of crawled pages."""
-    if MANIFEST_PATH.exists():
-        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"pages": {}, "last_crawl": None, "version": 1}
+def load_manifest(path: Path = MANIFEST_PATH, log_path: Path = MANIFEST_LOG_PATH) -> dict:
+    """
+    Load the existing manifest of crawled pages.
 
+    Page updates logged by an interrupted crawl since the last save are
+    replayed on top, so their pages are not lost.
+    """
+    if path.exists():
+        with open(path, "rb") as f:
+            manifest = orjson.loads(f.read()) if orjson else json.load(f)
+    else:
+        manifest = {"pages": {}, "last_crawl": None, "version": 1}
+
+    if log_path.exists():
+        replayed = 0
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    title, entry = json.loads(line)
+                except ValueError:
+                    # A crash can leave a torn final line
+                    logger.warning("Skipping unreadable manifest log line")
+                    continue
+                if entry is None:
+                    manifest["pages"].pop(title, None)
+                else:
+                    manifest["pages"][title] = entry
+                replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} manifest updates from interrupted crawl")
 
-def save_manifest(manifest: dict):
-    """Save the manifest."""
+    return manifest
+
+
+def _write_manifest(manifest: dict, path: Path = MANIFEST_PATH):
+    """Write the manifest atomically, so a crash never leaves a partial file."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path = path.with_suffix(".json.tmp")
+    if orjson:
+        tmp_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(path)
 
 
-def fetch_page_html(title: str) -> str | None:
-    """Fetch the HTML content of a wiki page."""
-    url = f"{BASE_URL}/{quote(title.replace(' ', '_'))}"
+def save_manifest(manifest: dict):
+    """Save the manifest and clear the update log it now includes."""
+    _write_manifest(manifest)
+    MANIFEST_LOG_PATH.unlink(missing_ok=True)
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            time.sleep(DELAY)
-            response = api.session.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {title}: {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
 
-    return None
+def _manifest_log_line(title: str, entry: dict | None) -> bytes:
+    """Encode one manifest update (None removes the page) as a log line."""
+    if orjson:
+        return orjson.dumps([title, entry]) + b"\n"
+    return json.dumps([title, entry], ensure_ascii=False).encode("utf-8") + b"\n"
 
 
-def rewrite_internal_links(soup: BeautifulSoup, base_url: str):
-    """Rewrite internal wiki links to point to our archive."""
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-
-        # Skip external links, anchors, and special URLs
-        if href.startswith(("http://", "https://", "mailto:", "#", "javascript:")):
-            # Check if it's a link to the wiki itself
-            if href.startswith(base_url + "/"):
-                path = href[len(base_url) + 1:]
-                if not path.startswith(("Special:", "api.php")):
-                    filename = title_to_filename(path.replace("_", " "))
-                    a["href"] = f"/wiki/{filename}"
-            continue
-
-        # Handle relative links
-        if href.startswith("/"):
-            path = href[1:]
-
-            # Skip special pages and API
-            if path.startswith(("Special:", "api.php", "index.php")):
-                a["href"] = base_url + href
-                continue
+# Title characters that never need percent-encoding in a page URL; most
+# titles consist only of these and can skip quote() entirely
+_URL_SAFE_EXTRA = "/:"
+_URL_SAFE = frozenset(string.ascii_letters + string.digits + "_.-~" + _URL_SAFE_EXTRA)
 
-            # Convert to archive link
-            title = path.replace("_", " ")
-            filename = title_to_filename(title)
-            a["href"] = f"/wiki/{filename}"
 
+def fetch_page_html(title: str, cached: dict | None = None) -> requests.Response | None:
+    """
+    Fetch a wiki page, revalidating against a previous crawl when possible.
 
-def make_images_absolute(soup: BeautifulSoup, base_url: str):
-    """Make image sources absolute and add fallback handling."""
-    for img in soup.find_all("img", src=True):
-        src = img["src"]
+    If `cached` (the page's manifest entry) holds an ETag or Last-Modified
+    value, it is sent as If-None-Match / If-Modified-Since so the server can
+    answer 304 Not Modified instead of resending the page.
 
-        if src.startswith("/"):
-            img["src"] = base_url + src
-        elif not src.startswith(("http://", "https://", "data:")):
-            img["src"] = urljoin(base_url, src)
+    Returns the response (status 200 or 304), or None on failure.
+    """
+    path = title.replace(" ", "_")
+    if not _URL_SAFE.issuperset(path):
+        path = quote(path, safe=_URL_SAFE_EXTRA)
+    url = f"{BASE_URL}/{path}"
 
-        img["onerror"] = "this.classList.add('archive-img-unavailable'); this.onerror=null;"
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
 
-        if not img.get("width") and not img.get("style"):
-            img["class"] = img.get("class", []) + ["archive-img"]
+    for attempt in range(MAX_RETRIES):
+        try:
+            api.throttle()
+            response = api.session.get(url, timeout=TIMEOUT, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            if is_rate_limited(e):
+                api.slow_down()
+            if not is_retryable(e):
+                logger.warning(f"Not retrying {title}: {e}")
+                return None
+            logger.warning(f"Attempt {attempt + 1}/{MAX_RETRIES} failed for {title}: {e}")
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(backoff_delay(attempt, RETRY_DELAY, MAX_BACKOFF, e.response))
 
+    return None
 
-def make_resources_absolute(soup: BeautifulSoup, base_url: str):
-    """Make CSS and JS resource URLs absolute so they load from the original wiki."""
-    for link in soup.find_all("link", href=True):
-        href = link["href"]
-        if href.startswith("/") and not href.startswith("//"):
-            link["href"] = base_url + href
 
-    for script in soup.find_all("script", src=True):
-        src = script["src"]
-        if src.startswith("/") and not src.startswith("//"):
-            script["src"] = base_url + src
+def fetch_parsed_html(title: str) -> str | None:
+    """
+    Fetch a page's rendered content through the API's action=parse.
+
+    Returns the parser output wrapped in the wiki's head/body shell (without
+    the skin's navigation), or None on failure.
+    """
+    params = {
+        "action": "parse",
+        "page": title,
+        "prop": "text|headhtml|displaytitle",
+        "formatversion": "2",
+    }
+    data = api.request(params, f"parsing {title}")
+    if not data or "parse" not in data:
+        if data:
+            logger.warning(f"Parse failed for {title}: {data.get('error', {}).get('info')}")
+        return None
 
+    parse = data["parse"]
+    return (
+        f'{parse["headhtml"]}'
+        f'<div id="content" class="mw-body">'
+        f'<h1 id="firstHeading" class="firstHeading">{parse["displaytitle"]}</h1>'
+        f'<div id="mw-content-text">{parse["text"]}</div>'
+        f'</div></body></html>'
+    )
+
+
+# Link prefix checks, compiled once instead of chained startswith calls per <a>
+_EXTERNAL_RE = re.compile(r"https?://|mailto:|#|javascript:")
+_WIKI_SKIP_RE = re.compile(r"Special:|api\.php")
+_SPECIAL_RE = re.compile(r"Special:|api\.php|index\.php")
+_IMG_ABSOLUTE_PREFIXES = ("http://", "https://", "data:")
+# Shared by every <img> rather than rebuilt per tag
+_IMG_ONERROR = "this.classList.add('archive-img-unavailable'); this.onerror=null;"
+
+
+def _rewrite_link(a, href: str, base_url: str, base_prefix: str):
+    """Rewrite an internal wiki link to point to our archive."""
+    # Skip external links, anchors, and special URLs
+    if _EXTERNAL_RE.match(href):
+        # Check if it's a link to the wiki itself
+        if href.startswith(base_prefix):
+            path = href[len(base_prefix):]
+            if not _WIKI_SKIP_RE.match(path):
+                filename = title_to_filename(path.replace("_", " "))
+                a["href"] = f"/wiki/{filename}"
+        return
+
+    # Handle relative links
+    if href.startswith("/"):
+        path = href[1:]
+
+        # Skip special pages and API
+        if _SPECIAL_RE.match(href, 1):
+            a["href"] = base_url + href
+            return
+
+        # Convert to archive link
+        title = path.replace("_", " ")
+        filename = title_to_filename(title)
+        a["href"] = f"/wiki/{filename}"
+
+
+def _make_image_absolute(img, src: str, base_url: str):
+    """Make an image source absolute and add fallback handling."""
+    if src.startswith("/"):
+        img["src"] = base_url + src
+    elif not src.startswith(_IMG_ABSOLUTE_PREFIXES):
+        img["src"] = urljoin(base_url, src)
+
+    img["onerror"] = _IMG_ONERROR
+
+    if not img.get("width") and not img.get("style"):
+        classes = img.get("class")
+        if classes:
+            classes.append("archive-img")
+        else:
+            img["class"] = ["archive-img"]
+
+
+def rewrite_page(soup: BeautifulSoup, base_url: str):
+    """
+    Rewrite links, images and CSS/JS resources in a single tree walk.
+
+    Internal links are pointed at the archive, image sources are made
+    absolute with a fallback handler, and stylesheet/script URLs are made
+    absolute so they load from the original wiki.
+    """
+    base_prefix = base_url + "/"
+
+    for tag in soup.find_all(("a", "img", "link", "script")):
+        name = tag.name
+        if name == "a":
+            href = tag.get("href")
+            if href is not None:
+                _rewrite_link(tag, href, base_url, base_prefix)
+        elif name == "img":
+            src = tag.get("src")
+            if src is not None:
+                _make_image_absolute(tag, src, base_url)
+        else:
+            attr = "href" if name == "link" else "src"
+            url = tag.get(attr)
+            if url is not None and url.startswith("/") and not url.startswith("//"):
+                tag[attr] = base_url + url
 
-def inject_archive_banner(soup: BeautifulSoup, crawl_timestamp: str):
-    """Inject the archive banner at the top of the page."""
+
+@lru_cache(maxsize=1)
+def _banner_nodes(crawl_timestamp: str) -> tuple:
+    """Parse the archive banner once per crawl; pages insert copies of it."""
     banner_html = f'''
     <div id="archive-banner">
         <div class="archive-banner-content">
@@ -180,75 +341,252 @@ def inject_archive_banner(soup: BeautifulSoup, crawl_timestamp: str):
     </div>
     '''
 
-    banner = BeautifulSoup(banner_html, "html.parser")
+    return tuple(BeautifulSoup(banner_html, "html.parser").contents)
+
 
-    head = soup.find("head")
+def inject_archive_banner(soup: BeautifulSoup, crawl_timestamp: str):
+    """Inject the archive banner at the top of the page."""
+    head = soup.head
     if head:
         css_link = soup.new_tag("link", rel="stylesheet", href="/assets/archive.css")
         head.append(css_link)
         js_link = soup.new_tag("script", src="/assets/archive.js")
         head.append(js_link)
 
-    body = soup.find("body")
+    body = soup.body
     if body:
-        body.insert(0, banner)
+        for i, node in enumerate(_banner_nodes(crawl_timestamp)):
+            body.insert(i, copy.copy(node))
+
+
+def content_hash(html: str) -> str:
+    """Return a short, stable digest of page content for change detection."""
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def process_page(
+    title: str, crawl_timestamp: str, cached: dict | None = None
+) -> tuple[str | None, dict] | None:
+    """
+    Fetch and process a single page.
+
+    Returns (html, metadata), where metadata holds the response's
+    etag/last_modified and a hash of the rewritten page content for the
+    manifest. html is None if the page is unchanged since the cached crawl,
+    either because the server answered 304 or because the content hash
+    matches. Returns None if the fetch failed. With USE_PARSE_API the
+    content comes from action=parse, which has no etag/last_modified, so
+    only the content hash can skip a write.
+    """
+    if USE_PARSE_API:
+        page_html = fetch_parsed_html(title)
+        if page_html is None:
+            return None
+        metadata = {}
+        encoding = None
+    else:
+        response = fetch_page_html(title, cached)
+        if response is None:
+            return None
+
+        metadata = {
+            key: response.headers[header]
+            for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+            if header in response.headers
+        }
+        if response.status_code == 304:
+            return None, metadata
+        # Hand lxml the raw bytes; decoding to str first would copy the page
+        page_html = response.content
+        encoding = response.encoding
+
+    soup = BeautifulSoup(page_html, "lxml", from_encoding=encoding)
+    rewrite_page(soup, BASE_URL)
+
+    # Hash before the banner so the crawl timestamp doesn't count as a change
+    content = soup.find(id="content") or soup
+    metadata["sha"] = content_hash(str(content))
+    if cached and cached.get("sha") == metadata["sha"]:
+        return None, metadata
 
+    inject_archive_banner(soup, crawl_timestamp)
 
-def process_page(title: str, crawl_timestamp: str) -> str | None:
-    """Fetch and process a single page."""
-    html = fetch_page_html(title)
-    if not html:
-        return None
+    return str(soup), metadata
+
+
+def crawl_pages(
+    titles: list[str],
+    manifest: dict,
+    crawl_timestamp: str,
+    revids: dict | None = None,
+    manifest_path: Path = MANIFEST_PATH,
+    log_path: Path = MANIFEST_LOG_PATH,
+) -> tuple[int, int]:
+    """
+    Fetch, process and save pages, up to CONCURRENCY at a time.
+
+    Pages are fetched on a thread pool so network waits overlap; results
+    are recorded in the manifest in title order, and their files are written
+    on a separate writer pool. Each finished page is also appended to the
+    manifest log, and the manifest is checkpointed every CHECKPOINT_INTERVAL
+    pages, so an interrupted crawl keeps its progress. All writes have
+    finished when this returns, so the manifest can be saved safely
+    afterwards. Known revision IDs from revids are recorded on each saved
+    entry. Checkpoints and the log go to manifest_path and log_path.
+
+    Returns (processed_count, failed_count).
+    """
+    total = len(titles)
+    processed = 0
+    failed = 0
 
-    soup = BeautifulSoup(html, "html.parser")
-    rewrite_internal_links(soup, BASE_URL)
-    make_images_absolute(soup, BASE_URL)
-    make_resources_absolute(soup, BASE_URL)
-    inject_archive_banner(soup, crawl_timestamp)
+    def fetch(item):
+        i, title, cached = item
+        logger.info(f"[{i}/{total}] Processing: {title}")
+        return title, process_page(title, crawl_timestamp, cached)
 
-    return str(soup)
+    # Only revalidate pages whose archived file is still on disk
+    work = []
+    for i, title in enumerate(titles, 1):
+        cached = manifest["pages"].get(title)
+        if cached and not (WIKI_DIR / cached["filename"]).exists():
+            cached = None
+        work.append((i, title, cached))
 
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    log_lock = threading.Lock()
+
+    def log_update(title, entry):
+        line = _manifest_log_line(title, entry)
+        with log_lock:
+            log.write(line)
+            log.flush()
+
+    def log_written(title, entry, future):
+        # Only record a page once its file is fully on disk
+        log_update(title, entry if future.exception() is None else None)
+
+    writes = []
+
+    def reap_writes():
+        # Drop pages whose file could not be written so the next run retries them
+        nonlocal processed, failed
+        for title, future in writes:
+            error = future.exception()
+            if error is not None:
+                logger.error(f"FAILED to write {title}: {error}")
+                del manifest["pages"][title]
+                processed -= 1
+                failed += 1
+        writes.clear()
+
+    def checkpoint():
+        # Fold the log into the manifest once every pending write has landed
+        reap_writes()
+        with log_lock:
+            _write_manifest(manifest, manifest_path)
+            log.truncate(0)
+        logger.info(f"Checkpoint: manifest saved after {processed} pages")
+
+    with open(log_path, "ab") as log, \
+            ThreadPoolExecutor(max_workers=WRITE_WORKERS) as writer, \
+            ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        for title, result in executor.map(fetch, work):
+            if result is None:
+                logger.error(f"FAILED to fetch: {title}")
+                failed += 1
+                continue
 
-def crawl_full():
-    """Perform a full crawl of the wiki."""
-    logger.info("=== FULL CRAWL ===")
-    crawl_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
+            html, metadata = result
+            if html is None:
+                # 304 Not Modified or identical content: keep the existing file
+                logger.info(f"Not modified: {title}")
+                entry = manifest["pages"][title]
+            else:
+                entry = {"filename": title_to_filename(title)}
+                manifest["pages"][title] = entry
+
+            entry["crawled"] = crawl_timestamp
+            entry.update(metadata)
+            if revids and title in revids:
+                entry["revid"] = revids[title]
+            processed += 1
 
-    all_pages = api.get_all_pages()
-    manifest = {"pages": {}, "last_crawl": crawl_timestamp, "version": 1}
+            if html is None:
+                log_update(title, entry)
+            else:
+                filepath = WIKI_DIR / entry["filename"]
+                future = writer.submit(filepath.write_bytes, html.encode("utf-8"))
+                future.add_done_callback(partial(log_written, title, entry))
+                writes.append((title, future))
 
-    WIKI_DIR.mkdir(parents=True, exist_ok=True)
+            if processed % CHECKPOINT_INTERVAL == 0:
+                checkpoint()
 
-    total = len(all_pages)
-    processed = 0
-    failed = 0
+    reap_writes()
+    return processed, failed
 
-    for i, page in enumerate(all_pages):
-        title = page["title"]
-        logger.info(f"[{i+1}/{total}] Processing: {title}")
 
-        html = process_page(title, crawl_timestamp)
-        if html:
-            filename = title_to_filename(title)
-            filepath = WIKI_DIR / filename
-            filepath.write_text(html, encoding="utf-8")
+def crawl_full(resume: bool = False):
+    """
+    Perform a full crawl of the wiki.
 
-            manifest["pages"][title] = {
-                "filename": filename,
-                "crawled": crawl_timestamp,
-            }
-            processed += 1
-        else:
-            logger.error(f"FAILED to fetch: {title}")
-            failed += 1
+    Progress is checkpointed to manifest.partial.json, which only replaces
+    manifest.json once the crawl completes, so an interrupted crawl never
+    clobbers the last good manifest. With resume, an interrupted full crawl
+    is continued: pages already crawled since it started are skipped, and
+    the crawl keeps its original start time so the next incremental run
+    still covers every edit made while it ran.
+    """
+    logger.info("=== FULL CRAWL ===")
+    crawl_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
 
+    manifest = load_manifest(MANIFEST_PARTIAL_PATH, MANIFEST_PARTIAL_LOG_PATH) if resume else {}
+    started = manifest.get("crawl_started")
+    if started:
+        crawl_timestamp = started
+        logger.info(f"Resuming full crawl started {started}")
+    else:
+        # Drop any abandoned partial crawl so its log isn't replayed later
+        MANIFEST_PARTIAL_PATH.unlink(missing_ok=True)
+        MANIFEST_PARTIAL_LOG_PATH.unlink(missing_ok=True)
+        manifest = {"pages": {}, "last_crawl": None, "crawl_started": crawl_timestamp, "version": 1}
+
+    all_pages = api.get_all_pages()
+
+    WIKI_DIR.mkdir(parents=True, exist_ok=True)
+
+    pages = manifest["pages"]
+    titles = [
+        page["title"] for page in all_pages
+        if pages.get(page["title"], {}).get("crawled", "") < crawl_timestamp
+    ]
+    if len(titles) < len(all_pages):
+        logger.info(f"Already crawled in this run: {len(all_pages) - len(titles)}")
+    processed, failed = crawl_pages(
+        titles, manifest, crawl_timestamp,
+        manifest_path=MANIFEST_PARTIAL_PATH, log_path=MANIFEST_PARTIAL_LOG_PATH,
+    )
+
+    # Promote the finished crawl to manifest.json
+    manifest["last_crawl"] = crawl_timestamp
+    del manifest["crawl_started"]
     save_manifest(manifest)
+    MANIFEST_PARTIAL_PATH.unlink(missing_ok=True)
+    MANIFEST_PARTIAL_LOG_PATH.unlink(missing_ok=True)
     logger.info(f"=== CRAWL COMPLETE === Processed: {processed}, Failed: {failed}")
     return manifest
 
 
-def crawl_incremental():
-    """Perform an incremental crawl based on recent changes."""
+def crawl_incremental(resume: bool = False):
+    """
+    Perform an incremental crawl based on recent changes.
+
+    An interrupted incremental crawl needs no special handling: last_crawl
+    only moves once it completes, and pages it already saved are skipped by
+    revision. If this falls back to a full crawl, it resumes an interrupted
+    one when asked to or when no crawl has ever completed.
+    """
     logger.info("=== INCREMENTAL CRAWL ===")
 
     manifest = load_manifest()
@@ -256,7 +594,9 @@ def crawl_incremental():
 
     if not last_crawl:
         logger.info("No previous crawl found. Running full crawl instead.")
-        return crawl_full()
+        # With no finished crawl there is nothing to protect, so carry on
+        # from an interrupted full crawl rather than starting over
+        return crawl_full(resume or MANIFEST_PARTIAL_PATH.exists())
 
     crawl_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
 
@@ -270,28 +610,18 @@ def crawl_incremental():
         logger.info("No changes since last crawl.")
         return manifest
 
-    WIKI_DIR.mkdir(parents=True, exist_ok=True)
-
-    processed = 0
-    failed = 0
+    # Skip pages whose archived revision is already current
+    revids = api.get_page_revisions(changed_pages)
+    pages = manifest["pages"]
+    titles = [
+        title for title in changed_pages
+        if title not in revids or pages.get(title, {}).get("revid") != revids[title]
+    ]
+    logger.info(f"Pages already at latest revision: {len(changed_pages) - len(titles)}")
 
-    for title in changed_pages:
-        logger.info(f"Processing: {title}")
-
-        html = process_page(title, crawl_timestamp)
-        if html:
-            filename = title_to_filename(title)
-            filepath = WIKI_DIR / filename
-            filepath.write_text(html, encoding="utf-8")
+    WIKI_DIR.mkdir(parents=True, exist_ok=True)
 
-            manifest["pages"][title] = {
-                "filename": filename,
-                "crawled": crawl_timestamp,
-            }
-            processed += 1
-        else:
-            logger.error(f"FAILED to fetch: {title}")
-            failed += 1
+    processed, failed = crawl_pages(titles, manifest, crawl_timestamp, revids)
 
     manifest["last_crawl"] = crawl_timestamp
     save_manifest(manifest)
@@ -306,23 +636,26 @@ def main():
     logger.info("=" * 50)
     logger.info(f"User-Agent: {USER_AGENT}")
     logger.info(f"Delay: {DELAY} seconds between requests")
+    logger.info(f"Concurrency: {CONCURRENCY} pages at a time")
 
     mode = "incremental"
+    resume = "--resume" in sys.argv[1:]
     if len(sys.argv) > 1:
         if sys.argv[1] in ("--full", "-f"):
             mode = "full"
         elif sys.argv[1] in ("--incremental", "-i"):
             mode = "incremental"
         elif sys.argv[1] in ("--help", "-h"):
-            print("Usage: crawl.py [--full | --incremental]")
+            print("Usage: crawl.py [--full | --incremental] [--resume]")
             print("  --full, -f        Perform full crawl of entire wiki")
             print("  --incremental, -i Crawl only pages changed since last run (default)")
+            print("  --resume          Continue an interrupted full crawl from its last checkpoint")
             sys.exit(0)
 
     if mode == "full":
-        crawl_full()
+        crawl_full(resume)
     else:
-        crawl_incremental()
+        crawl_incremental(resume)
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Wiki Static Mirror - Post-Processing Fix
 Fixes CSS references and layout issues in wget-mirrored wiki pages.
 
 Usage:
-    python fix-static-mirror.py <mirror_directory> [--wiki-name NAME] [--live-url URL]
+    python fix-static-mirror.py <mirror_directory> [--wiki-name NAME] [--live-url URL] [--workers N]
 
 Examples:
     python fix-static-mirror.py ./gswiki-static-2026-01-15 --wiki-name "GSWiki" --live-url "https://gswiki.play.net"
@@ -14,13 +14,28 @@ Examples:
 import argparse
 import os
 import re
+import shutil
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # Default values (can be overridden via command line)
 DEFAULT_WIKI_NAME = "GSWiki"
 DEFAULT_LIVE_URL = "https://gswiki.play.net"
 
+# Patterns applied to every mirrored file, compiled once. They work on raw
+# bytes so files are never decoded and re-encoded.
+RE_LOAD_TAG = re.compile(
+    rb'<link[^>]*href="[^"]*load\.php[^"]*"[^>]*/?>'
+    rb'|<script[^>]*src="[^"]*load\.php[^"]*"[^>]*></script>'
+)
+RE_HEAD = re.compile(rb'<head\b[^>]*>', re.IGNORECASE)
+RE_BODY = re.compile(rb'(<body[^>]*>)')
+# Root-relative links with no query string or extension, i.e. wiki pages
+RE_INTERNAL_HREF = re.compile(rb'href="/([^"?.]*)"')
+
 # Minimal CSS to make the wiki look right offline
 # Use WIKI_NAME_PLACEHOLDER which will be replaced at runtime
 OFFLINE_CSS_TEMPLATE = """
@@ -276,10 +291,48 @@ def get_archive_banner(wiki_name, live_url):
     )
 
 
-def fix_html_file(filepath, wiki_name, live_url):
-    """Fix CSS references and layout in a single HTML file."""
+def iter_html(root):
+    """Yield the path of every .html file under root, recursively."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_html(entry.path)
+            elif entry.name.endswith('.html') and entry.is_file():
+                yield entry.path
+
+
+def find_html(root):
+    """
+    List every .html file under root.
+
+    Uses find(1) when available, which walks large mirrors much faster than
+    Python; falls back to iter_html() if find is missing or fails.
+    """
+    find = shutil.which('find')
+    if find:
+        try:
+            result = subprocess.run(
+                [find, str(root), '-type', 'f', '-name', '*.html', '-print0'],
+                capture_output=True,
+                check=True,
+            )
+            return [os.fsdecode(path) for path in result.stdout.split(b'\0') if path]
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"  find failed ({e}), falling back to directory scan")
+    return list(iter_html(root))
+
+
+def fix_html_file(filepath, offline_css, archive_banner):
+    """
+    Fix CSS references and layout in a single HTML file.
+
+    offline_css and archive_banner are the rendered UTF-8 bytes of
+    get_offline_css() and get_archive_banner(), built once per run. The
+    file is rewritten through a temporary file, so an interrupted run never
+    leaves it half-written.
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        with open(filepath, 'rb') as f:
             content = f.read()
     except Exception as e:
         print(f"  Error reading {filepath}: {e}")
@@ -287,62 +340,38 @@ def fix_html_file(filepath, wiki_name, live_url):
 
     original = content
 
-    # Remove external CSS links (they don't work offline)
-    content = re.sub(
-        r'<link[^>]*href="[^"]*load\.php[^"]*"[^>]*/?>',
-        '',
-        content
-    )
-
-    # Remove external script references to load.php
-    content = re.sub(
-        r'<script[^>]*src="[^"]*load\.php[^"]*"[^>]*></script>',
-        '',
-        content
-    )
-
-    # Get CSS and banner with wiki-specific values
-    offline_css = get_offline_css(wiki_name)
-    archive_banner = get_archive_banner(wiki_name, live_url)
+    # Remove external CSS links and script references to load.php
+    # (they don't work offline) in a single pass; a plain substring test
+    # skips the regex on files that have none
+    if b'load.php' in content:
+        content = RE_LOAD_TAG.sub(b'', content)
 
-    # Inject our CSS after <head>
-    if '<head>' in content:
-        content = content.replace('<head>', '<head>' + offline_css, 1)
-    elif '<HEAD>' in content:
-        content = content.replace('<HEAD>', '<HEAD>' + offline_css, 1)
+    # Inject our CSS after <head> (any case, with or without attributes)
+    content = RE_HEAD.sub(lambda m: m.group(0) + offline_css, content, count=1)
 
     # Add archive banner after <body...>
-    content = re.sub(
-        r'(<body[^>]*>)',
-        r'\1' + archive_banner,
-        content,
-        count=1
-    )
+    content = RE_BODY.sub(rb'\1' + archive_banner, content, count=1)
 
     # Fix internal links - convert /PageName to PageName.html
-    # But only for links that look like wiki pages (not external, not anchors)
-    def fix_link(match):
-        href = match.group(1)
-        # Skip external links, anchors, and already-fixed links
-        if href.startswith('http') or href.startswith('#') or href.endswith('.html'):
-            return match.group(0)
-        if href.startswith('/'):
-            # Convert /Page_Name to Page_Name.html
-            page = href[1:]  # Remove leading /
-            if '?' not in page and '.' not in page:
-                return f'href="{page}.html"'
-        return match.group(0)
-
-    content = re.sub(r'href="([^"]*)"', fix_link, content)
+    # Only links that look like wiki pages match (not external, not anchors,
+    # not already-fixed .html links, nothing with a query string)
+    if b'href="/' in content:
+        content = RE_INTERNAL_HREF.sub(rb'href="\1.html"', content)
 
     # Only write if changed
     if content != original:
+        tmp_path = f"{filepath}.tmp"
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'wb') as f:
                 f.write(content)
+            os.replace(tmp_path, filepath)
             return True
         except Exception as e:
             print(f"  Error writing {filepath}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             return False
 
     return False
@@ -366,6 +395,12 @@ def main():
         default=DEFAULT_LIVE_URL,
         help=f"URL of the live wiki (default: {DEFAULT_LIVE_URL})"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU core)"
+    )
     args = parser.parse_args()
 
     mirror_dir = Path(args.mirror_directory)
@@ -382,17 +417,24 @@ def main():
     print()
 
     # Find all HTML files
-    html_files = list(mirror_dir.glob("**/*.html"))
+    html_files = find_html(mirror_dir)
     print(f"Found {len(html_files)} HTML files")
 
-    fixed = 0
-    for i, filepath in enumerate(html_files):
-        if fix_html_file(filepath, wiki_name, live_url):
-            fixed += 1
+    # Render CSS and banner with wiki-specific values once for all files
+    offline_css = get_offline_css(wiki_name).encode('utf-8')
+    archive_banner = get_archive_banner(wiki_name, live_url).encode('utf-8')
 
-        # Progress indicator
-        if (i + 1) % 100 == 0:
-            print(f"  Processed {i + 1}/{len(html_files)} files...")
+    # Files are independent, so fix them in parallel across CPU cores
+    fix = partial(fix_html_file, offline_css=offline_css, archive_banner=archive_banner)
+    fixed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for i, was_fixed in enumerate(executor.map(fix, html_files, chunksize=64)):
+            if was_fixed:
+                fixed += 1
+
+            # Progress indicator
+            if (i + 1) % 100 == 0:
+                print(f"  Processed {i + 1}/{len(html_files)} files...")
 
     print()
     print(f"Done! Fixed {fixed} files.")
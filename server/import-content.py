@@ -13,16 +13,35 @@ Usage (after `source server/config/<wiki>.conf`):
     python3 server/import-content.py --recent    # Import recent changes only
     python3 server/import-content.py --templates # Templates, categories, MediaWiki pages only
     python3 server/import-content.py --images    # Import images
+    python3 server/import-content.py --full --resume  # Continue an interrupted import
 """
 
 import argparse
+import io
+import json
+import logging
 import os
+import queue
+import re
+import shutil
+import signal
+import sqlite3
+import stat
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Iterable, Sized
 from datetime import datetime, timezone, timedelta
+from itertools import count, islice
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 # Add project root to path for shared lib
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
@@ -41,46 +60,162 @@ def env_or_exit(name: str, default=None):
     return value
 
 
-# Configuration from environment (with defaults for paths)
-WIKI_ID = env_or_exit("WIKI_ID")
-WIKI_NAME = env_or_exit("WIKI_NAME")
-SOURCE_API = env_or_exit("SOURCE_API")
-LOCAL_WIKI_DIR = env_or_exit("WIKI_DIR", "/var/www/gswiki-archive")
-DELAY_SECONDS = float(env_or_exit("DELAY_SECONDS", "2"))
-BATCH_SIZE = int(env_or_exit("BATCH_SIZE", "50"))
+# Exported batches allowed to wait for import during a full import
+EXPORT_QUEUE_SIZE = 2
+# Read size when streaming each image to disk, and the size above which a
+# downloaded image is dropped from the page cache once written
+IMAGE_CHUNK_SIZE = 64 * 1024
+IMAGE_UNCACHED_BYTES = 1024 * 1024
+
+# The $wgReadOnly assignment in LocalSettings.php, active and commented out
+RE_READ_ONLY_ON = re.compile(rb'^(\$wgReadOnly\s*=)', re.MULTILINE)
+RE_READ_ONLY_OFF = re.compile(rb'^# (\$wgReadOnly\s*=)', re.MULTILINE)
+
+# Configuration, derived paths and clients; set by _load_config() once the
+# command line has been parsed, so --help works without a sourced config
+WIKI_ID: str
+WIKI_NAME: str
+SOURCE_API: str
+LOCAL_WIKI_DIR: str
+DELAY_SECONDS: float
+BATCH_SIZE: int
+NAMESPACE_WORKERS: int
+IMPORT_CHUNK: int
+IMPORT_BATCH_SIZE: int
+MAINTENANCE_WORKERS: int
+IMAGE_WORKERS: int
+LOG_DIR: Path
+LOCAL_SETTINGS: Path
+ARCHIVE_DATE_FILE: Path
+RECENT_MARKER_FILE: Path
+IMPORT_STATE_DB: Path
+logger: logging.Logger
+api: WikiAPI
+IMAGE_SESSION: requests.Session
+
+
+def _load_config():
+    """Read the wiki config from the environment and set up logging and clients."""
+    global WIKI_ID, WIKI_NAME, SOURCE_API, LOCAL_WIKI_DIR, DELAY_SECONDS, BATCH_SIZE
+    global NAMESPACE_WORKERS, IMPORT_CHUNK, IMPORT_BATCH_SIZE
+    global MAINTENANCE_WORKERS, IMAGE_WORKERS, LOG_DIR
+    global LOCAL_SETTINGS, ARCHIVE_DATE_FILE, RECENT_MARKER_FILE, IMPORT_STATE_DB
+    global logger, api, IMAGE_SESSION
+
+    # Configuration from environment (with defaults for paths)
+    WIKI_ID = env_or_exit("WIKI_ID")
+    WIKI_NAME = env_or_exit("WIKI_NAME")
+    SOURCE_API = env_or_exit("SOURCE_API")
+    LOCAL_WIKI_DIR = env_or_exit("WIKI_DIR", "/var/www/gswiki-archive")
+    DELAY_SECONDS = float(env_or_exit("DELAY_SECONDS", "2"))
+    BATCH_SIZE = int(env_or_exit("BATCH_SIZE", "50"))
+    # Namespaces listed concurrently when enumerating pages (capped by WikiAPI)
+    NAMESPACE_WORKERS = int(env_or_exit("NAMESPACE_WORKERS", "4"))
+    # Export batches merged into each importDump.php run, so PHP/MediaWiki
+    # startup is paid once per IMPORT_CHUNK batches instead of once per batch
+    IMPORT_CHUNK = int(env_or_exit("IMPORT_CHUNK", "20"))
+    IMPORT_BATCH_SIZE = BATCH_SIZE * IMPORT_CHUNK
+    # Concurrent refreshLinks.php processes after an import; half the cores
+    # by default to leave headroom for the database
+    MAINTENANCE_WORKERS = int(env_or_exit("MAINTENANCE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    # Concurrent image downloads
+    IMAGE_WORKERS = int(env_or_exit("IMAGE_WORKERS", "8"))
+
+    # Configurable paths with defaults
+    LOG_DIR = Path(os.environ.get("LOG_DIR", "/var/log"))
+
+    # Derived paths
+    LOCAL_SETTINGS = Path(LOCAL_WIKI_DIR) / "LocalSettings.php"
+    ARCHIVE_DATE_FILE = Path(LOCAL_WIKI_DIR) / ".archive-date"
+    RECENT_MARKER_FILE = Path(LOCAL_WIKI_DIR) / ".recent-import-ts"
+    IMPORT_STATE_DB = Path(LOCAL_WIKI_DIR) / ".import-state.db"
+
+    # Set up logging
+    logger = setup_logging(
+        name="import",
+        wiki_id=WIKI_ID,
+        log_dir=str(LOG_DIR),
+        use_queue=True,
+        compress_backups=True,
+    )
+
+    # Set up API client
+    api = WikiAPI(
+        api_url=SOURCE_API,
+        wiki_name=WIKI_NAME,
+        delay=DELAY_SECONDS,
+        logger=logger,
+        workers=NAMESPACE_WORKERS,
+    )
+
+    # Shared keep-alive session for image downloads (API calls use
+    # api.session), so each image reuses an open connection instead of a new
+    # TCP/TLS handshake. urllib3 retries throttled and failed responses with
+    # exponential backoff. Each download worker gets its own pooled
+    # connection, so none is opened and discarded per image.
+    IMAGE_SESSION = requests.Session()
+    image_adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=IMAGE_WORKERS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+        ),
+    )
+    IMAGE_SESSION.mount("https://", image_adapter)
+    IMAGE_SESSION.mount("http://", image_adapter)
+    IMAGE_SESSION.headers["User-Agent"] = api.session.headers["User-Agent"]
+
+
+# LocalSettings.php before and after disable_read_only(), so
+# enable_read_only() can restore the original exactly
+_original_settings: bytes | None = None
+_import_settings: bytes | None = None
 
-# Configurable paths with defaults
-TMP_DIR = Path(os.environ.get("TMP_DIR", "/tmp"))
-LOG_DIR = Path(os.environ.get("LOG_DIR", "/var/log"))
+# Start time reserved for the next image request, shared by all workers
+_image_lock = threading.Lock()
+_next_image_at = 0.0
 
-# Derived paths
-LOCAL_SETTINGS = Path(LOCAL_WIKI_DIR) / "LocalSettings.php"
-ARCHIVE_DATE_FILE = Path(LOCAL_WIKI_DIR) / ".archive-date"
-RECENT_MARKER_FILE = Path(LOCAL_WIKI_DIR) / ".recent-import-ts"
 
-# Set up logging
-logger = setup_logging(
-    name="import",
-    wiki_id=WIKI_ID,
-    log_dir=str(LOG_DIR),
-)
+def write_local_settings(content: bytes):
+    """
+    Replace LocalSettings.php atomically, keeping its owner and mode.
 
-# Set up API client
-api = WikiAPI(
-    api_url=SOURCE_API,
-    wiki_name=WIKI_NAME,
-    delay=DELAY_SECONDS,
-    logger=logger,
-)
+    The new content goes to a private temporary file that is renamed over
+    the original, so a crash never leaves a half-written LocalSettings.php.
+    """
+    tmp_path = LOCAL_SETTINGS.with_name(LOCAL_SETTINGS.name + ".tmp")
+    st = LOCAL_SETTINGS.stat()
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        try:
+            os.chown(tmp_path, st.st_uid, st.st_gid)
+        except PermissionError:
+            pass
+        os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+        os.replace(tmp_path, LOCAL_SETTINGS)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def disable_read_only():
     """Temporarily disable read-only mode for import."""
+    global _original_settings, _import_settings
     logger.info("Disabling read-only mode for import...")
     try:
-        content = LOCAL_SETTINGS.read_text()
-        new_content = content.replace('$wgReadOnly =', '# $wgReadOnly =')
-        LOCAL_SETTINGS.write_text(new_content)
+        content = LOCAL_SETTINGS.read_bytes()
+        new_content, count = RE_READ_ONLY_ON.subn(rb'# \1', content)
+        if count:
+            write_local_settings(new_content)
+        else:
+            # fix-styling.sh may have commented it out permanently
+            logger.info("$wgReadOnly is not set in LocalSettings.php; nothing to disable")
+        _original_settings, _import_settings = content, new_content
         return True
     except Exception as e:
         logger.warning(f"Could not disable read-only: {e}")
@@ -89,17 +224,36 @@ def disable_read_only():
 
 def enable_read_only():
     """Re-enable read-only mode after import."""
+    global _original_settings, _import_settings
     logger.info("Re-enabling read-only mode...")
     try:
-        content = LOCAL_SETTINGS.read_text()
-        new_content = content.replace('# $wgReadOnly =', '$wgReadOnly =')
-        LOCAL_SETTINGS.write_text(new_content)
+        content = LOCAL_SETTINGS.read_bytes()
+        if _original_settings is not None and content == _import_settings:
+            # Untouched since disable_read_only(): restore it exactly
+            new_content = _original_settings
+        else:
+            new_content, count = RE_READ_ONLY_OFF.subn(rb'\1', content)
+            if not count:
+                raise ValueError("no commented-out $wgReadOnly line in LocalSettings.php")
+        if new_content != content:
+            write_local_settings(new_content)
+        _original_settings = _import_settings = None
         return True
     except Exception as e:
         logger.warning(f"Could not re-enable read-only: {e}")
         return False
 
 
+def exit_on_sigterm(signum, frame):
+    """
+    Turn SIGTERM into SystemExit so cleanup in finally blocks runs.
+
+    Nothing is logged here: the interrupted code may hold the logging
+    handler's lock, so main() logs the exit once it has unwound.
+    """
+    raise SystemExit(128 + signum)
+
+
 def update_archive_date():
     """Update the archive date marker file."""
     logger.info("Updating archive date...")
@@ -129,102 +283,357 @@ def save_recent_marker(timestamp: str):
         logger.warning(f"Could not write recent marker: {e}")
 
 
-def import_xml(xml_content: str) -> bool:
-    """Import XML content into local MediaWiki."""
-    tmp_file = TMP_DIR / f"{WIKI_ID}-import.xml"
-    tmp_file.write_text(xml_content, encoding="utf-8")
+def merge_exports(docs: list[bytes]) -> bytes:
+    """
+    Merge several Special:Export XML documents into one.
+
+    The first document's <mediawiki> and <siteinfo> header is kept; the
+    pages of every document follow it under a single closing tag. Documents
+    stay as raw UTF-8 bytes, the form importDump.php reads them in.
+    """
+    header_end = docs[0].find(b"</siteinfo>")
+    if header_end < 0:
+        raise ValueError("export XML has no <siteinfo> header")
+    header_end += len(b"</siteinfo>")
+
+    parts = [docs[0][:header_end]]
+    for doc in docs:
+        start = doc.find(b"</siteinfo>")
+        end = doc.rfind(b"</mediawiki>")
+        if start < 0 or end < 0:
+            raise ValueError("export XML is not a complete <mediawiki> document")
+        parts.append(doc[start + len(b"</siteinfo>"):end])
+    parts.append(b"</mediawiki>\n")
+    return b"".join(parts)
+
+
+def export_batch(titles: list[str], batch_num: int, total_batches: int | None = None) -> tuple[bytes | None, list[str]]:
+    """
+    Export a batch of pages as one XML document.
+
+    The titles are exported BATCH_SIZE at a time (the API's per-request
+    limit) and the exports merged. Responses are streamed into byte
+    buffers and never decoded, so no str copy of the batch is made.
+
+    Returns (xml, exported_titles); xml is None if nothing was exported.
+    """
+    label = f"{batch_num}/{total_batches}" if total_batches else f"{batch_num}"
+    logger.info(f"[Batch {label}] Exporting {len(titles)} pages...")
+
+    docs = []
+    exported = []
+    for i in range(0, len(titles), BATCH_SIZE):
+        export = titles[i:i + BATCH_SIZE]
+        buffer = api.export_pages(export, sink=io.BytesIO())
+        if buffer is not None and buffer.tell():
+            docs.append(buffer.getvalue())
+            exported.extend(export)
+        else:
+            logger.error(f"  Failed to export {len(export)} pages")
+
+    if not docs:
+        return None, []
+    try:
+        return merge_exports(docs), exported
+    except ValueError as e:
+        logger.error(f"  Batch {batch_num} export unusable: {e}")
+        return None, []
+
+
+class BatchImporter:
+    """
+    Import exported batches with one importDump.php run per batch.
+
+    importDump.php only reports success when it exits, so giving each
+    batch its own run lets a failure cost just that batch; on_imported, if
+    given, is called with the titles of each batch that made it in. The
+    XML is streamed to the process's stdin rather than buffered by
+    subprocess.
+    """
+
+    def __init__(self, on_imported=None):
+        self.on_imported = on_imported
+        self.imported = 0
+        self.failed = 0
+
+    def add(self, xml: bytes | None, exported: list[str], total: int, batch_num: int):
+        """Import one exported batch (from export_batch)."""
+        if xml is None:
+            self.failed += total
+            return
+
+        try:
+            ok = self._run(xml)
+        except OSError as e:
+            logger.error(f"  [Batch {batch_num}] Batch failed: {e}")
+            self.failed += total
+            return
+
+        if ok:
+            logger.info(f"  [Batch {batch_num}] Imported {len(exported)} pages")
+            self.imported += len(exported)
+            self.failed += total - len(exported)
+            if self.on_imported:
+                self.on_imported(exported)
+        else:
+            logger.error(f"  [Batch {batch_num}] Failed to import batch")
+            self.failed += total
+
+    def _run(self, xml: bytes) -> bool:
+        # stderr goes to a file so a chatty import can never fill the pipe
+        # and stall while we are blocked writing to stdin
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(
+                ["php", f"{LOCAL_WIKI_DIR}/maintenance/importDump.php"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            broken = False
+            try:
+                proc.stdin.write(xml)
+                proc.stdin.close()
+            except OSError:
+                # importDump.php exited early; its stderr says why
+                broken = True
+            ok = proc.wait() == 0 and not broken
+
+            if not ok:
+                stderr.seek(0)
+                logger.error(f"Import error: {stderr.read().decode('utf-8', errors='replace')}")
+        return ok
+
+
+def import_pages(pages: Iterable[str], on_imported=None) -> tuple[int, int]:
+    """
+    Export and import pages in batches of IMPORT_BATCH_SIZE.
+
+    pages may be a lazy iterator (see WikiAPI.get_page_titles_iter): batches
+    are cut from it as they are needed, so importing starts after the first
+    batch of titles arrives instead of after the whole listing.
+
+    Batches are exported on a background thread while this one streams
+    them into importDump.php, so the polite API delays overlap with local
+    import time. The bounded queue keeps at most EXPORT_QUEUE_SIZE exported
+    batches in memory, and imports stay serialized to avoid database
+    contention. on_imported is passed to BatchImporter.
+
+    If listing or exporting stops early, the batches already exported are
+    still imported and then the error is re-raised, so a truncated run is
+    never reported as complete.
+
+    Returns (imported_count, failed_count).
+    """
+    total_batches = None
+    if isinstance(pages, Sized):
+        total_batches = (len(pages) + IMPORT_BATCH_SIZE - 1) // IMPORT_BATCH_SIZE
+    exports = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+    export_error = None
+
+    def produce():
+        nonlocal export_error
+        titles = iter(pages)
+        try:
+            for batch_num in count(1):
+                batch = list(islice(titles, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                xml, exported = export_batch(batch, batch_num, total_batches)
+                exports.put((xml, exported, len(batch), batch_num))
+        except Exception as e:
+            logger.error(f"Export stopped early: {e}")
+            export_error = e
+        finally:
+            exports.put(None)
+
+    producer = threading.Thread(target=produce, name="exporter", daemon=True)
+    producer.start()
+
+    importer = BatchImporter(on_imported=on_imported)
+    while (item := exports.get()) is not None:
+        importer.add(*item)
+
+    producer.join()
+    if export_error is not None:
+        raise export_error
+    return importer.imported, importer.failed
+
+
+class ImportCheckpoint:
+    """
+    Titles imported so far by one import mode, kept in a SQLite database.
+
+    Each batch is committed as soon as its importDump.php run succeeds, so
+    a run started with --resume after a crash or kill skips every batch
+    that already made it in. Commits are fully synced, so a confirmed batch
+    survives a power loss too.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._con = sqlite3.connect(IMPORT_STATE_DB)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=FULL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS done ("
+            "mode TEXT NOT NULL, title TEXT NOT NULL, PRIMARY KEY (mode, title)"
+            ") WITHOUT ROWID"
+        )
+
+    def done(self) -> set[str]:
+        """Titles this mode has already imported."""
+        rows = self._con.execute("SELECT title FROM done WHERE mode = ?", (self.mode,))
+        return {title for (title,) in rows}
+
+    def record(self, titles: list[str]):
+        """Mark titles as imported."""
+        with self._con:
+            self._con.executemany(
+                "INSERT OR IGNORE INTO done VALUES (?, ?)",
+                [(self.mode, title) for title in titles],
+            )
+
+    def clear(self):
+        """Forget this mode's progress."""
+        with self._con:
+            self._con.execute("DELETE FROM done WHERE mode = ?", (self.mode,))
+
+    def close(self):
+        self._con.close()
+
+
+def import_resumable(mode: str, titles: Iterable[str], resume: bool = False) -> tuple[int, int]:
+    """
+    Run import_pages() for one import mode, checkpointing its progress.
+
+    With resume, titles an earlier run of the same mode already imported are
+    skipped; otherwise that earlier progress is discarded first. Progress is
+    cleared only once every title has been exported and imported with no
+    failures. If listing or exporting stops early, import_pages raises before
+    that point and the checkpoint is kept, so only unfinished or partly
+    failed runs leave anything to resume.
+
+    Returns (imported_count, failed_count).
+    """
+    checkpoint = ImportCheckpoint(mode)
+    try:
+        if resume:
+            done = checkpoint.done()
+            if done:
+                logger.info(f"Resuming: skipping {len(done)} pages already imported")
+                if isinstance(titles, Sized):
+                    titles = [title for title in titles if title not in done]
+                else:
+                    titles = (title for title in titles if title not in done)
+        else:
+            checkpoint.clear()
+
+        # Raises if the title stream was cut short, skipping the clear below
+        imported, failed = import_pages(titles, on_imported=checkpoint.record)
+        if not failed:
+            checkpoint.clear()
+    finally:
+        checkpoint.close()
+
+    return imported, failed
+
 
+def clear_import_state():
+    """Delete saved import progress for every mode (--fresh)."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{IMPORT_STATE_DB}{suffix}").unlink(missing_ok=True)
+
+
+def max_page_id() -> int | None:
+    """Return the highest page_id in the local wiki, or None if unknown."""
     result = subprocess.run(
-        ["php", f"{LOCAL_WIKI_DIR}/maintenance/importDump.php", str(tmp_file)],
+        ["php", f"{LOCAL_WIKI_DIR}/maintenance/sql.php", "--json",
+         "--query", "SELECT MAX(page_id) AS max_id FROM page"],
         capture_output=True,
-        text=True
+        text=True,
     )
-
     if result.returncode != 0:
-        logger.error(f"Import error: {result.stderr}")
-        return False
+        logger.warning(f"Could not read max page_id: {result.stderr.strip()}")
+        return None
 
-    return True
+    try:
+        return int(json.loads(result.stdout)[0]["max_id"])
+    except (ValueError, LookupError, TypeError) as e:
+        logger.warning(f"Could not parse max page_id: {e}")
+        return None
 
 
-def import_batch(titles: list[str], batch_num: int, total_batches: int) -> tuple[int, int]:
-    """Import a batch of pages. Returns (imported_count, failed_count)."""
-    logger.info(f"[Batch {batch_num}/{total_batches}] Exporting {len(titles)} pages...")
-
-    try:
-        xml = api.export_pages(titles)
-        if xml and import_xml(xml):
-            logger.info(f"  Imported {len(titles)} pages")
-            return len(titles), 0
-        else:
-            logger.error(f"  Failed to import batch")
-            return 0, len(titles)
-    except Exception as e:
-        logger.error(f"  Batch failed: {e}")
-        return 0, len(titles)
+def page_id_ranges(max_id: int, parts: int) -> list[tuple[int, int]]:
+    """Split page_ids 1..max_id into up to `parts` inclusive (start, end) ranges."""
+    step = -(-max_id // parts)
+    return [(start, min(start + step - 1, max_id)) for start in range(1, max_id + 1, step)]
 
 
 def run_maintenance():
-    """Run MediaWiki maintenance scripts after import."""
-    logger.info("Rebuilding search index...")
-    subprocess.run(["php", f"{LOCAL_WIKI_DIR}/maintenance/rebuildtextindex.php"])
+    """
+    Run MediaWiki maintenance scripts after import.
+
+    refreshLinks.php is split into page_id ranges handled by up to
+    MAINTENANCE_WORKERS concurrent processes. rebuildtextindex.php truncates
+    and refills the search index in one pass, so it runs on its own once
+    the link refresh is done rather than competing with it for the database.
+    """
+    maintenance = f"{LOCAL_WIKI_DIR}/maintenance"
+    jobs = []
+
+    # Only look up the page_id range when it will be partitioned
+    max_id = max_page_id() if MAINTENANCE_WORKERS > 1 else None
+    if max_id:
+        # refreshLinks.php takes the first page_id as a positional argument
+        # and the last (inclusive) as --e
+        for start, end in page_id_ranges(max_id, MAINTENANCE_WORKERS):
+            jobs.append((
+                f"refreshLinks.php {start}-{end}",
+                ["php", f"{maintenance}/refreshLinks.php", str(start), "--e", str(end)],
+            ))
+    else:
+        jobs.append(("refreshLinks.php", ["php", f"{maintenance}/refreshLinks.php"]))
 
-    logger.info("Refreshing links...")
-    subprocess.run(["php", f"{LOCAL_WIKI_DIR}/maintenance/refreshLinks.php"])
+    logger.info(f"Refreshing links ({len(jobs)} processes)...")
+    procs = [(name, subprocess.Popen(cmd)) for name, cmd in jobs]
+    for name, proc in procs:
+        if proc.wait() != 0:
+            logger.warning(f"{name} exited with status {proc.returncode}")
+
+    logger.info("Rebuilding search index...")
+    result = subprocess.run(["php", f"{maintenance}/rebuildtextindex.php"])
+    if result.returncode != 0:
+        logger.warning(f"rebuildtextindex.php exited with status {result.returncode}")
 
 
-def full_import():
+def full_import(resume: bool = False):
     """Perform full import of all pages (including user/talk and redirects)."""
     logger.info("=== FULL IMPORT ===")
 
-    pages = api.get_page_titles()
-    logger.info(f"Pages to import: {len(pages)}")
-
-    total_batches = (len(pages) + BATCH_SIZE - 1) // BATCH_SIZE
-    imported = 0
-    failed = 0
-
-    for i in range(0, len(pages), BATCH_SIZE):
-        batch = pages[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        batch_imported, batch_failed = import_batch(batch, batch_num, total_batches)
-        imported += batch_imported
-        failed += batch_failed
-
+    # Titles are listed while earlier batches export and import
+    imported, failed = import_resumable("full", api.get_page_titles_iter(), resume)
     logger.info(f"=== IMPORT COMPLETE === Imported: {imported}, Failed: {failed}")
     run_maintenance()
 
 
-def templates_import():
+def templates_import(resume: bool = False):
     """Import only templates, MediaWiki pages, and categories (not main articles)."""
     logger.info("=== IMPORTING TEMPLATES & MEDIAWIKI PAGES ===")
 
     # Only non-article namespaces: 4=Project, 6=File, 8=MediaWiki, 10=Template, 14=Category
     namespaces = [4, 6, 8, 10, 14]
-    pages = api.get_page_titles(namespaces=namespaces)
-    logger.info(f"Pages to import: {len(pages)}")
-
-    total_batches = (len(pages) + BATCH_SIZE - 1) // BATCH_SIZE
-    imported = 0
-    failed = 0
-
-    for i in range(0, len(pages), BATCH_SIZE):
-        batch = pages[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        batch_imported, batch_failed = import_batch(batch, batch_num, total_batches)
-        imported += batch_imported
-        failed += batch_failed
+    imported, failed = import_resumable("templates", api.get_page_titles_iter(namespaces=namespaces), resume)
 
     logger.info(f"=== IMPORT COMPLETE === Imported: {imported}, Failed: {failed}")
 
 
-def recent_import():
+def recent_import(resume: bool = False):
     """Import only recently changed pages."""
     logger.info("=== IMPORTING RECENT CHANGES ===")
 
     # Use last run marker if present; otherwise default to 7-day window
     since = load_recent_marker()
-    titles = list(api.get_recent_changes(since))
+    titles = api.get_recent_changes(since)
 
     logger.info(f"Recent pages to import since {since}: {len(titles)}")
 
@@ -233,21 +642,68 @@ def recent_import():
         save_recent_marker(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
         return
 
-    total_batches = (len(titles) + BATCH_SIZE - 1) // BATCH_SIZE
-    imported = 0
-    failed = 0
-
-    for i in range(0, len(titles), BATCH_SIZE):
-        batch = titles[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        batch_imported, batch_failed = import_batch(batch, batch_num, total_batches)
-        imported += batch_imported
-        failed += batch_failed
+    imported, failed = import_resumable("recent", titles, resume)
 
     logger.info(f"=== IMPORT COMPLETE === Imported: {imported}, Failed: {failed}")
     save_recent_marker(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
 
 
+def throttle_images():
+    """
+    Wait for this worker's turn to request an image.
+
+    Slots are handed out DELAY_SECONDS apart across all download workers, so
+    the source wiki sees the same request rate as a serial download while
+    the workers overlap waiting on responses.
+    """
+    global _next_image_at
+    with _image_lock:
+        now = time.monotonic()
+        start = max(now, _next_image_at)
+        _next_image_at = start + DELAY_SECONDS
+
+    if start > now:
+        time.sleep(start - now)
+
+
+def drop_from_page_cache(f):
+    """
+    Ask the kernel to evict a freshly written large file from the page cache.
+
+    Files under IMAGE_UNCACHED_BYTES are left alone. Larger ones are flushed
+    first, since only clean pages can be dropped, so a run of big downloads
+    doesn't push MySQL's and PHP's hot pages out of memory. No-op where
+    posix_fadvise is unavailable (e.g. macOS).
+    """
+    if not hasattr(os, "posix_fadvise") or f.tell() < IMAGE_UNCACHED_BYTES:
+        return
+    f.flush()
+    os.fdatasync(f.fileno())
+    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def download_image(img: dict, img_dir: Path) -> bool:
+    """Download one image into img_dir. Returns True on success."""
+    name = img["name"]
+    filepath = img_dir / name
+    try:
+        throttle_images()
+        # Stream straight to disk so large images are never held in memory
+        with IMAGE_SESSION.get(img["url"], timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(filepath, "wb") as f:
+                shutil.copyfileobj(response.raw, f, IMAGE_CHUNK_SIZE)
+                drop_from_page_cache(f)
+        return True
+
+    except Exception as e:
+        logger.error(f"  Failed {name}: {e}")
+        # Don't leave a truncated file for importImages.php to pick up
+        filepath.unlink(missing_ok=True)
+        return False
+
+
 def import_images():
     """Import images from source wiki."""
     logger.info("=== IMPORTING IMAGES ===")
@@ -259,23 +715,18 @@ def import_images():
     img_dir = Path(LOCAL_WIKI_DIR) / "images" / "imported"
     img_dir.mkdir(parents=True, exist_ok=True)
 
-    for i, img in enumerate(images):
-        name = img["name"]
-        url = img["url"]
-
-        logger.info(f"[{i+1}/{len(images)}] Downloading: {name}")
-
-        try:
-            time.sleep(DELAY_SECONDS)
-            import requests
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            filepath = img_dir / name
-            filepath.write_bytes(response.content)
+    # Downloads are network-bound, so overlap them; throttle_images() keeps
+    # the combined request rate at one per DELAY_SECONDS
+    failed = 0
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as executor:
+        futures = {executor.submit(download_image, img, img_dir): img for img in images}
+        for i, future in enumerate(as_completed(futures)):
+            if future.result():
+                logger.info(f"[{i+1}/{len(images)}] Downloaded: {futures[future]['name']}")
+            else:
+                failed += 1
 
-        except Exception as e:
-            logger.error(f"  Failed: {e}")
+    logger.info(f"Downloaded {len(images) - failed} images, {failed} failed")
 
     # Import via maintenance script
     logger.info("Importing images into MediaWiki...")
@@ -292,38 +743,51 @@ def import_images():
 
 
 def main():
-    parser = argparse.ArgumentParser(description=f"Import {WIKI_NAME} content")
+    wiki_name = os.environ.get("WIKI_NAME", "wiki")
+    parser = argparse.ArgumentParser(description=f"Import {wiki_name} content")
     parser.add_argument("--full", action="store_true", help="Full import of all pages")
     parser.add_argument("--recent", action="store_true", help="Import recent changes only")
     parser.add_argument("--images", action="store_true", help="Import images")
     parser.add_argument("--templates", action="store_true", help="Import only templates, MediaWiki pages, categories (fast)")
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument("--resume", action="store_true", help="Skip pages an interrupted run already imported")
+    progress.add_argument("--fresh", action="store_true", help="Discard saved import progress for all modes first")
     args = parser.parse_args()
 
     if not any([args.full, args.recent, args.images, args.templates]):
         parser.print_help()
         sys.exit(1)
 
+    _load_config()
+    if args.fresh:
+        clear_import_state()
     logger.info(f"{WIKI_NAME} Archive - Content Import")
     logger.info("=" * 50)
 
-    # Disable read-only mode for import
+    # Disable read-only mode for import; a SIGTERM (e.g. from systemd or
+    # timeout) still runs the finally block that re-enables it
+    signal.signal(signal.SIGTERM, exit_on_sigterm)
     disable_read_only()
 
     try:
         if args.full:
-            full_import()
+            full_import(args.resume)
 
         if args.templates:
-            templates_import()
+            templates_import(args.resume)
 
         if args.recent:
-            recent_import()
+            recent_import(args.resume)
 
         if args.images:
             import_images()
 
         # Update the archive date after successful import
         update_archive_date()
+    except SystemExit as e:
+        if e.code == 128 + signal.SIGTERM:
+            logger.warning("Received SIGTERM, stopping import...")
+        raise
     finally:
         # Always re-enable read-only mode, even if import fails
         enable_read_only()
@@ -6,7 +6,7 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.filename_utils import title_to_filename, filename_to_title
+from lib.filename_utils import title_to_filename, title_to_filename_bytes, filename_to_title
 
 
 class TestTitleToFilename:
@@ -56,6 +56,15 @@ class TestTitleToFilename:
         assert title_to_filename("Path\\File") == "Path_BACKSLASH_File.html"
 
 
+class TestTitleToFilenameBytes:
+    """Tests for title_to_filename_bytes function."""
+
+    def test_matches_str_variant(self):
+        """Bytes variant should be the UTF-8 encoding of title_to_filename."""
+        for title in ("Main Page", "Category:Items/Weapons?", "Caf\u00e9 <Menu>"):
+            assert title_to_filename_bytes(title) == title_to_filename(title).encode("utf-8")
+
+
 class TestFilenameToTitle:
     """Tests for filename_to_title function."""
 
@@ -77,6 +86,29 @@ class TestFilenameToTitle:
         filename = "Category_COLON_Items_SLASH_Weapons_QUESTION_.html"
         assert filename_to_title(filename) == "Category:Items/Weapons?"
 
+    def test_only_extension_suffix_removed(self):
+        """Only the trailing .html extension should be stripped."""
+        assert filename_to_title("Writing .html pages.html") == "Writing .html pages"
+        assert filename_to_title("No extension") == "No extension"
+
+
+class TestCaching:
+    """Tests for memoization of the conversion functions."""
+
+    def test_repeated_titles_hit_cache(self):
+        """Repeated conversions should be served from the cache."""
+        title_to_filename.cache_clear()
+        title_to_filename("Category:Cached")
+        title_to_filename("Category:Cached")
+        assert title_to_filename.cache_info().hits == 1
+
+    def test_repeated_filenames_hit_cache(self):
+        """Repeated reverse conversions should be served from the cache."""
+        filename_to_title.cache_clear()
+        filename_to_title("Category_COLON_Cached.html")
+        filename_to_title("Category_COLON_Cached.html")
+        assert filename_to_title.cache_info().hits == 1
+
 
 class TestRoundtrip:
     """Tests for roundtrip conversion (title -> filename -> title)."""
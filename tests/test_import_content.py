@@ -0,0 +1,66 @@
+"""Tests for the server content import script."""
+
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture
+def import_content(tmp_path, monkeypatch):
+    """Load server/import-content.py with a small batch size and no PHP."""
+    spec = importlib.util.spec_from_file_location(
+        "import_content", PROJECT_ROOT / "server" / "import-content.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    module.logger = logging.getLogger("test-import")
+    module.IMPORT_BATCH_SIZE = 2
+    module.IMPORT_STATE_DB = tmp_path / ".import-state.db"
+    monkeypatch.setattr(module, "export_batch", lambda titles, *args: (b"<mediawiki/>", titles))
+    monkeypatch.setattr(module.BatchImporter, "_run", lambda self, xml: True)
+    return module
+
+
+def done_titles(module, mode):
+    checkpoint = module.ImportCheckpoint(mode)
+    try:
+        return checkpoint.done()
+    finally:
+        checkpoint.close()
+
+
+class TestImportResumable:
+    """Tests for import_resumable checkpointing."""
+
+    def test_clears_checkpoint_after_complete_run(self, import_content):
+        """A run that imports every title should leave nothing to resume."""
+        assert import_content.import_resumable("full", iter("ABCD")) == (4, 0)
+
+        assert done_titles(import_content, "full") == set()
+
+    def test_keeps_checkpoint_when_export_stops_early(self, import_content):
+        """An export error partway through should keep the progress made so far."""
+        def titles():
+            yield from "ABCD"
+            raise RuntimeError("listing failed")
+
+        with pytest.raises(RuntimeError, match="listing failed"):
+            import_content.import_resumable("full", titles())
+
+        assert done_titles(import_content, "full") == {"A", "B", "C", "D"}
+
+    def test_resume_skips_checkpointed_titles(self, import_content):
+        """A resumed run should only import titles not yet checkpointed."""
+        checkpoint = import_content.ImportCheckpoint("full")
+        checkpoint.record(["A", "B"])
+        checkpoint.close()
+
+        assert import_content.import_resumable("full", iter("ABCD"), resume=True) == (2, 0)
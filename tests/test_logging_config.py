@@ -1,13 +1,16 @@
 """Tests for logging configuration."""
 
+import gzip
 import logging
+import logging.handlers
 import sys
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.logging_config import setup_logging, get_log_dir
+from lib import logging_config
+from lib.logging_config import AsyncRotatingFileHandler, setup_logging, get_log_dir
 
 
 class TestSetupLogging:
@@ -87,6 +90,87 @@ class TestSetupLogging:
 
         assert log_dir.exists()
 
+    def test_queue_handler_writes_in_background(self, temp_log_dir):
+        """use_queue should route records through a QueueListener to the file."""
+        logger = setup_logging(
+            name="queued",
+            log_dir=str(temp_log_dir),
+            console=False,
+            use_queue=True,
+        )
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+        logger.info("Queued message")
+        logging_config._listeners.pop("queued").stop()
+
+        content = (temp_log_dir / "queued.log").read_text()
+        assert "Queued message" in content
+
+    def test_reinitialization_stops_previous_listener(self, temp_log_dir):
+        """Re-running setup_logging should replace the previous listener."""
+        setup_logging(name="queued", log_dir=str(temp_log_dir), console=False, use_queue=True)
+        first = logging_config._listeners["queued"]
+
+        setup_logging(name="queued", log_dir=str(temp_log_dir), console=False, use_queue=True)
+        second = logging_config._listeners.pop("queued")
+        second.stop()
+
+        assert first is not second
+        assert first._thread is None
+
+
+class TestAsyncRotatingFileHandler:
+    """Tests for AsyncRotatingFileHandler."""
+
+    def test_rollover_shifts_backups(self, temp_log_dir):
+        """Rollovers should produce the usual .1/.2 backups, newest first."""
+        log_file = temp_log_dir / "rotate.log"
+        handler = AsyncRotatingFileHandler(log_file, maxBytes=1, backupCount=2, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        for message in ("first", "second", "third"):
+            handler.emit(logging.makeLogRecord({"msg": message}))
+        handler.close()
+
+        assert log_file.read_text().strip() == "third"
+        assert (temp_log_dir / "rotate.log.1").read_text().strip() == "second"
+        assert (temp_log_dir / "rotate.log.2").read_text().strip() == "first"
+        assert not (temp_log_dir / "rotate.log.1.pending").exists()
+
+    def test_rollover_compresses_backups(self, temp_log_dir):
+        """With compress=True, backups should be gzipped and shifted."""
+        log_file = temp_log_dir / "rotate.log"
+        handler = AsyncRotatingFileHandler(
+            log_file, maxBytes=1, backupCount=2, encoding="utf-8", compress=True
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        for message in ("first", "second", "third"):
+            handler.emit(logging.makeLogRecord({"msg": message}))
+        handler.close()
+
+        assert log_file.read_text().strip() == "third"
+        with gzip.open(temp_log_dir / "rotate.log.1.gz", "rt") as f:
+            assert f.read().strip() == "second"
+        with gzip.open(temp_log_dir / "rotate.log.2.gz", "rt") as f:
+            assert f.read().strip() == "first"
+        assert not (temp_log_dir / "rotate.log.1").exists()
+
+    def test_setup_logging_uses_async_rotation(self, temp_log_dir):
+        """setup_logging should install the async rotating handler."""
+        logger = setup_logging(name="test", log_dir=str(temp_log_dir), console=False)
+        assert isinstance(logger.handlers[0], AsyncRotatingFileHandler)
+
+    def test_setup_logging_keeps_plain_backups_by_default(self, temp_log_dir):
+        """setup_logging should only gzip backups when asked to."""
+        plain = setup_logging(name="plain", log_dir=str(temp_log_dir), console=False)
+        assert plain.handlers[0].namer is None
+
+        gzipped = setup_logging(
+            name="gzipped", log_dir=str(temp_log_dir), console=False, compress_backups=True
+        )
+        assert gzipped.handlers[0].rotation_filename("gzipped.log.1") == "gzipped.log.1.gz"
+
 
 class TestGetLogDir:
     """Tests for get_log_dir function."""
@@ -1,15 +1,25 @@
 """Tests for WikiAPI client."""
 
+import io
 import sys
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
+import pytest
 import requests
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lib.wiki_api import WikiAPI
+from lib import wiki_api
+from lib.wiki_api import MAX_WORKERS, RATE_LIMIT_SLOWDOWN, TITLES_PER_QUERY, WikiAPI
+
+
+@pytest.fixture(autouse=True)
+def stdlib_json(monkeypatch):
+    """Decode with response.json() so mocked responses work with or without orjson."""
+    monkeypatch.setattr(wiki_api, "orjson", None)
 
 
 class TestWikiAPIInit:
@@ -50,6 +60,52 @@ class TestWikiAPIInit:
         assert api.session is not None
         assert "User-Agent" in api.session.headers
 
+    def test_session_uses_pooled_adapter(self):
+        """WikiAPI should mount a keep-alive connection pool for both schemes."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        https_adapter = api.session.get_adapter("https://wiki.example.com")
+        http_adapter = api.session.get_adapter("http://wiki.example.com")
+        assert https_adapter is http_adapter
+        assert https_adapter._pool_maxsize == 16
+        assert https_adapter._pool_block is True
+        assert api.session.headers["Connection"] == "keep-alive"
+
+    def test_pool_size_covers_workers(self):
+        """The connection pool should never be smaller than the worker count."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            workers=4,
+            pool_size=2,
+        )
+        assert api.session.get_adapter("https://wiki.example.com")._pool_maxsize == 4
+
+
+class TestWikiAPIThrottle:
+    """Tests for WikiAPI.throttle method."""
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_spaces_requests_across_threads(self, mock_sleep):
+        """Requests from different threads should share one delay."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            delay=10.0,
+        )
+
+        api.throttle()
+        mock_sleep.assert_not_called()
+
+        worker = threading.Thread(target=api.throttle)
+        worker.start()
+        worker.join()
+
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(10.0, abs=1.0)
+
 
 class TestWikiAPIRequest:
     """Tests for WikiAPI.request method."""
@@ -72,6 +128,24 @@ class TestWikiAPIRequest:
         call_args = api.session.get.call_args
         assert call_args[1]["params"]["format"] == "json"
 
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_keeps_explicit_format(self, mock_sleep):
+        """Request should not override a format the caller already set."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+
+        mock_response = Mock()
+        mock_response.json.return_value = {}
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        params = {"action": "query", "format": "json"}
+        api.request(params)
+
+        assert api.session.get.call_args[1]["params"] is params
+
     @patch('lib.wiki_api.time.sleep')
     def test_request_returns_json(self, mock_sleep):
         """Request should return parsed JSON."""
@@ -89,9 +163,10 @@ class TestWikiAPIRequest:
         result = api.request({"action": "query"})
         assert result == expected_data
 
+    @patch('lib.wiki_api.time.monotonic')
     @patch('lib.wiki_api.time.sleep')
-    def test_request_respects_delay(self, mock_sleep):
-        """Request should sleep for the configured delay."""
+    def test_request_respects_delay(self, mock_sleep, mock_monotonic):
+        """Back-to-back requests should be spaced by the configured delay."""
         api = WikiAPI(
             api_url="https://wiki.example.com/api.php",
             wiki_name="TestWiki",
@@ -103,9 +178,157 @@ class TestWikiAPIRequest:
         mock_response.raise_for_status = Mock()
         api.session.get = Mock(return_value=mock_response)
 
+        mock_monotonic.return_value = 100.0
+        api.request({"action": "query"})
+        mock_sleep.assert_not_called()
+
         api.request({"action": "query"})
         mock_sleep.assert_called_with(3.0)
 
+    @patch('lib.wiki_api.time.monotonic')
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_delay_counts_server_time(self, mock_sleep, mock_monotonic):
+        """Time already spent since the last request should shorten the wait."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            delay=3.0,
+        )
+
+        mock_response = Mock()
+        mock_response.json.return_value = {}
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        mock_monotonic.return_value = 100.0
+        api.request({"action": "query"})
+
+        mock_monotonic.return_value = 102.0
+        api.request({"action": "query"})
+        mock_sleep.assert_called_once_with(1.0)
+
+        mock_monotonic.return_value = 110.0
+        api.request({"action": "query"})
+        mock_sleep.assert_called_once()
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_decodes_bytes_with_orjson(self, mock_sleep, monkeypatch):
+        """Request should decode response bytes with orjson when available."""
+        fake_orjson = Mock()
+        fake_orjson.loads.return_value = {"query": {}}
+        monkeypatch.setattr(wiki_api, "orjson", fake_orjson)
+
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        mock_response = Mock()
+        mock_response.content = b'{"query": {}}'
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        assert api.request({"action": "query"}) == {"query": {}}
+        fake_orjson.loads.assert_called_once_with(b'{"query": {}}')
+        mock_response.json.assert_not_called()
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_retries_invalid_json(self, mock_sleep):
+        """Request should treat undecodable bodies as a failed attempt."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            max_retries=2,
+        )
+        mock_response = Mock()
+        mock_response.json.side_effect = ValueError("bad json")
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        assert api.request({"action": "query"}) is None
+        assert api.session.get.call_count == 2
+
+
+    @staticmethod
+    def _http_error_response(status, headers=None):
+        response = Mock()
+        response.status_code = status
+        response.headers = headers or {}
+        response.raise_for_status = Mock(
+            side_effect=requests.HTTPError(f"{status} error", response=response)
+        )
+        return response
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_fails_fast_on_client_error(self, mock_sleep):
+        """A 404 should not be retried."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        api.session.get = Mock(return_value=self._http_error_response(404))
+
+        assert api.request({"action": "query"}) is None
+        assert api.session.get.call_count == 1
+
+    @patch('lib.wiki_api.random.uniform', return_value=0.25)
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_retries_server_error_with_backoff(self, mock_sleep, mock_uniform):
+        """5xx responses should be retried with growing, capped, jittered delays."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            delay=0,
+            max_retries=4,
+            retry_delay=5.0,
+            max_backoff=12.0,
+        )
+        api.session.get = Mock(return_value=self._http_error_response(503))
+
+        assert api.request({"action": "query"}) is None
+        assert api.session.get.call_count == 4
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [5.25, 10.25, 12.25]
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_honors_retry_after(self, mock_sleep):
+        """A 429 with Retry-After should wait exactly that long before retrying."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            delay=0,
+            max_retries=2,
+        )
+        ok_response = Mock()
+        ok_response.json.return_value = {"query": {}}
+        ok_response.raise_for_status = Mock()
+        api.session.get = Mock(side_effect=[
+            self._http_error_response(429, {"Retry-After": "7"}),
+            ok_response,
+        ])
+
+        assert api.request({"action": "query"}) == {"query": {}}
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_request_slows_down_when_rate_limited(self, mock_sleep):
+        """A 429 should raise the delay between requests; a 503 should not."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            delay=2.0,
+            max_retries=3,
+        )
+        ok_response = Mock()
+        ok_response.json.return_value = {"query": {}}
+        ok_response.raise_for_status = Mock()
+        api.session.get = Mock(side_effect=[
+            self._http_error_response(503),
+            self._http_error_response(429),
+            ok_response,
+        ])
+
+        assert api.request({"action": "query"}) == {"query": {}}
+        assert api.delay == pytest.approx(2.0 * RATE_LIMIT_SLOWDOWN)
+
 
 class TestWikiAPIGetNamespaces:
     """Tests for WikiAPI.get_namespaces method."""
@@ -165,6 +388,23 @@ class TestWikiAPIGetNamespaces:
         namespaces = api.get_namespaces()
         assert namespaces == sorted(namespaces)
 
+    @patch('lib.wiki_api.time.sleep')
+    def test_ignores_non_numeric_keys(self, mock_sleep):
+        """get_namespaces should skip keys that are not namespace IDs."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "query": {"namespaces": {"-2": {}, "0": {}, "bogus": {}, "4": {}}}
+        }
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        assert api.get_namespaces() == [0, 4]
+
     @patch('lib.wiki_api.time.sleep')
     def test_returns_default_on_failure(self, mock_sleep):
         """get_namespaces should return [0] on API failure."""
@@ -260,6 +500,101 @@ class TestWikiAPIGetAllPages:
         assert pages[1]["title"] == "Page 2"
 
 
+    @patch('lib.wiki_api.time.sleep')
+    def test_concurrent_namespaces_keep_order(self, mock_sleep):
+        """get_all_pages with workers should return pages in namespace order."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            workers=3,
+        )
+
+        def fake_get(url, params, timeout):
+            ns = params["apnamespace"]
+            response = Mock()
+            response.json.return_value = {
+                "query": {"allpages": [{"pageid": int(ns), "title": f"Page {ns}"}]}
+            }
+            response.raise_for_status = Mock()
+            return response
+
+        api.session.get = Mock(side_effect=fake_get)
+
+        pages = api.get_all_pages(namespaces=[0, 10, 14])
+
+        assert [p["title"] for p in pages] == ["Page 0", "Page 10", "Page 14"]
+
+    def test_workers_are_capped(self):
+        """WikiAPI should never use more than MAX_WORKERS workers."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            workers=50,
+        )
+        assert api.workers == MAX_WORKERS
+
+
+class TestWikiAPIIterPages:
+    """Tests for WikiAPI.iter_pages method."""
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_yields_first_batch_before_fetching_next(self, mock_sleep):
+        """iter_pages should yield a batch before requesting the next one."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+
+        page1_response = Mock()
+        page1_response.json.return_value = {
+            "query": {"allpages": [{"pageid": 1, "title": "Page 1"}]},
+            "continue": {"apcontinue": "Page 2"},
+        }
+        page1_response.raise_for_status = Mock()
+
+        page2_response = Mock()
+        page2_response.json.return_value = {
+            "query": {"allpages": [{"pageid": 2, "title": "Page 2"}]}
+        }
+        page2_response.raise_for_status = Mock()
+
+        api.session.get = Mock(side_effect=[page1_response, page2_response])
+
+        pages = api.iter_pages(namespaces=[0])
+        assert next(pages)["title"] == "Page 1"
+        assert api.session.get.call_count == 1
+
+        assert [p["title"] for p in pages] == ["Page 2"]
+        assert api.session.get.call_args[1]["params"]["apcontinue"] == "Page 2"
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_lists_namespaces_concurrently(self, mock_sleep):
+        """iter_pages with workers should list every namespace across threads."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+            workers=3,
+        )
+        threads = set()
+
+        def fake_get(url, params, timeout):
+            threads.add(threading.get_ident())
+            ns = params["apnamespace"]
+            response = Mock()
+            response.json.return_value = {
+                "query": {"allpages": [{"pageid": int(ns), "title": f"Page {ns}"}]}
+            }
+            response.raise_for_status = Mock()
+            return response
+
+        api.session.get = Mock(side_effect=fake_get)
+
+        titles = [p["title"] for p in api.iter_pages(namespaces=[0, 10, 14])]
+
+        assert sorted(titles) == ["Page 0", "Page 10", "Page 14"]
+        assert threading.get_ident() not in threads
+
+
 class TestWikiAPIGetPageTitles:
     """Tests for WikiAPI.get_page_titles method."""
 
@@ -295,3 +630,180 @@ class TestWikiAPIGetPageTitles:
         titles = api.get_page_titles()
 
         assert titles == ["Main Page", "Test Page"]
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_iter_yields_titles_lazily(self, mock_sleep):
+        """get_page_titles_iter should fetch nothing until iterated."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+
+        pages_response = Mock()
+        pages_response.json.return_value = {
+            "query": {
+                "allpages": [
+                    {"pageid": 1, "title": "Main Page"},
+                    {"pageid": 2, "title": "Test Page"},
+                ]
+            }
+        }
+        pages_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=pages_response)
+
+        titles = api.get_page_titles_iter(namespaces=[0])
+        assert api.session.get.call_count == 0
+
+        assert list(titles) == ["Main Page", "Test Page"]
+
+
+class TestWikiAPIGetRecentChanges:
+    """Tests for WikiAPI.get_recent_changes method."""
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_dedupes_in_change_order(self, mock_sleep):
+        """get_recent_changes should drop repeats but keep first-seen order."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "query": {
+                "recentchanges": [
+                    {"title": "Zeta"},
+                    {"title": "Alpha"},
+                    {"title": "Zeta"},
+                    {"title": "Mid"},
+                ]
+            }
+        }
+        mock_response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=mock_response)
+
+        changes = api.get_recent_changes("2024-01-01T00:00:00Z")
+
+        assert changes == ["Zeta", "Alpha", "Mid"]
+
+
+class TestWikiAPIGetPageRevisions:
+    """Tests for WikiAPI.get_page_revisions method."""
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_batches_titles(self, mock_sleep):
+        """get_page_revisions should query TITLES_PER_QUERY titles per request."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        titles = [f"Page {i}" for i in range(TITLES_PER_QUERY + 1)]
+
+        def respond(url, params, timeout):
+            response = Mock()
+            response.json.return_value = {
+                "query": {
+                    "pages": {
+                        str(i): {"pageid": i, "title": title, "revisions": [{"revid": 100 + i}]}
+                        for i, title in enumerate(params["titles"].split("|"))
+                    }
+                }
+            }
+            response.raise_for_status = Mock()
+            return response
+
+        api.session.get = Mock(side_effect=respond)
+
+        revisions = api.get_page_revisions(titles)
+
+        assert api.session.get.call_count == 2
+        assert len(revisions) == len(titles)
+        assert revisions["Page 0"] == 100
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_maps_normalized_titles_and_skips_missing(self, mock_sleep):
+        """Normalized titles should map back to the input; missing pages are left out."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+
+        response = Mock()
+        response.json.return_value = {
+            "query": {
+                "normalized": [{"from": "Main_Page", "to": "Main Page"}],
+                "pages": {
+                    "1": {"pageid": 1, "title": "Main Page", "revisions": [{"revid": 42}]},
+                    "-1": {"title": "Gone", "missing": ""},
+                },
+            }
+        }
+        response.raise_for_status = Mock()
+        api.session.get = Mock(return_value=response)
+
+        revisions = api.get_page_revisions(["Main_Page", "Gone"])
+
+        assert revisions == {"Main_Page": 42}
+
+
+class TestWikiAPIExportPages:
+    """Tests for WikiAPI.export_pages method."""
+
+    def _mock_export(self, api, chunks):
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = iter(chunks)
+        api.session.get = Mock(return_value=response)
+        return response
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_returns_decoded_xml(self, mock_sleep):
+        """export_pages should join streamed chunks into a string."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        self._mock_export(api, [b"<mediawiki>", "<page>\u00e9</page>".encode("utf-8"), b"</mediawiki>"])
+
+        xml = api.export_pages(["Main Page"])
+
+        assert xml == "<mediawiki><page>\u00e9</page></mediawiki>"
+        assert api.session.get.call_args[1]["stream"] is True
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_replaces_invalid_utf8(self, mock_sleep):
+        """export_pages should not fail on bytes that are not valid UTF-8."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        self._mock_export(api, [b"<mediawiki>\xff", b"</mediawiki>"])
+
+        xml = api.export_pages(["Main Page"])
+
+        assert xml == "<mediawiki>\ufffd</mediawiki>"
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_writes_to_sink(self, mock_sleep):
+        """export_pages should stream chunks into a provided sink."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        self._mock_export(api, [b"<mediawiki>", b"</mediawiki>"])
+        sink = io.BytesIO()
+
+        result = api.export_pages(["Main Page"], sink=sink)
+
+        assert result is sink
+        assert sink.getvalue() == b"<mediawiki></mediawiki>"
+
+    @patch('lib.wiki_api.time.sleep')
+    def test_returns_none_on_failure(self, mock_sleep):
+        """export_pages should return None when the request fails."""
+        api = WikiAPI(
+            api_url="https://wiki.example.com/api.php",
+            wiki_name="TestWiki",
+        )
+        api.session.get = Mock(side_effect=requests.RequestException("Network error"))
+
+        assert api.export_pages(["Main Page"]) is None